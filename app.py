@@ -1,11 +1,15 @@
 # app.py
 
+import time
 import streamlit as st
-import plotly.graph_objects as go
-from btc_data import fetch_ohlcv, add_technical_indicators, get_current_price
-from sentiment import get_bitcoin_sentiment
-from probo_strategy import interpret_market_conditions
-from predictor import recommend_probo_vote_for_target
+from probo_core import metrics
+from probo_core.binance_stream import start_stream, streaming_enabled
+from probo_core.market_daemon import daemon_socket
+from probo_core.market_snapshot import build_snapshot
+from probo_core.resample import DERIVED_INTERVALS, fetch_timeframe, resampling_enabled
+from probo_core.predictor import strike_ladder
+from probo_core import prediction_cache as cached
+from probo_core import prediction_ledger
 from telegram_bot import send_telegram_alert
 from datetime import datetime, timedelta
 
@@ -20,14 +24,35 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 st.title("📲 BTC Probo Predictor (Mobile Friendly)")
+_render_started = time.perf_counter()
 
-# Fetch market data
+# Optional live feed (BTC_STREAM=1): one background WebSocket shared by every session.
+# With a market daemon (BTC_MARKET_SOCKET) the daemon owns the stream instead.
+@st.cache_resource
+def _start_live_stream():
+    return start_stream("BTCUSDT", "1h")
+
+if streaming_enabled() and not daemon_socket():
+    _start_live_stream()
+
+# Fills in the outcomes of recorded predictions once their target time passes
+@st.cache_resource
+def _start_ledger_resolver():
+    return prediction_ledger.start_resolver()
+
+_start_ledger_resolver()
+
+# Fetch market data (once per render; everything below reuses this snapshot, and
+# reruns reuse the one pinned for the current data version so the caches hit)
 with st.spinner("Loading BTC data..."):
-    df = fetch_ohlcv()
-    df = add_technical_indicators(df)
-    current_price = get_current_price()
-    sentiment_score = get_bitcoin_sentiment()
-    market = interpret_market_conditions(df)
+    snapshot = cached.pin_snapshot(build_snapshot())
+    df = snapshot.candles.to_frame()
+    current_price = snapshot.price
+    sentiment_score = snapshot.sentiment
+    market = cached.market_conditions(snapshot)
+
+if snapshot.missing:
+    st.warning(f"⏱️ Some data sources timed out, using fallbacks for: {', '.join(snapshot.missing)}")
 
 st.metric("💰 BTC Price", f"${current_price:,.2f}")
 st.markdown("---")
@@ -40,6 +65,9 @@ with st.form("predict_form"):
         target_price = st.number_input("Target Price (USDT)", value=65000)
     with col2:
         target_time_str = st.text_input("Target Time (HH:MM in IST)", value="23:00")
+    ladder_step = st.number_input("Strike ladder step (USDT)", value=250, min_value=1)
+    projection_mode = st.selectbox("Projection mode", ["linear", "monte_carlo"],
+                                   format_func=lambda m: "Linear trend" if m == "linear" else "Monte Carlo probability")
 
     predict = st.form_submit_button("Get Recommendation")
 
@@ -58,7 +86,7 @@ if predict:
         hours_remaining_float = time_diff.total_seconds() / 3600.0
 
         # Run prediction
-        result = recommend_probo_vote_for_target(target_price, parsed_time)
+        result = cached.vote_for_target(target_price, parsed_time, snapshot, mode=projection_mode)
 
         # Display summary
         with st.expander("📊 Prediction Summary", expanded=True):
@@ -66,58 +94,50 @@ if predict:
             st.markdown(f"**Avg Δ/hr:** ${result['avg_delta_per_hour']}")
             st.markdown(f"**Time Left:** {result['hours_remaining']} hr(s)")
             st.markdown(f"**Projected Price:** ${result['projected_price']}")
+            if "probability" in result:
+                low, high = result["probability_ci"]
+                st.markdown(f"**P(price ≥ target):** {result['probability']:.1%} (95% CI {low:.1%} – {high:.1%})")
             st.markdown(f"**Sentiment Score:** {result['sentiment']}")
             st.markdown(f"**Target Time (IST):** {target_time_str}")
 
         st.success(f"🧠 Recommended Vote: **{result['vote']}**")
 
-        # --- Integrate Trust/Caution Logic to generate advice string ---
-        trust_signals = 0
-        caution_flags = 0
-        advice_summary = [] # To collect advice for the Telegram message
-
-        # Evaluate Trust Conditions
-        if hours_remaining_float < 2:
-            trust_signals += 1
-        if market['bullish_trend'] or (market['ema_20'] < market['ema_50'] and df['close'].iloc[-1] < df['EMA_20'].iloc[-1]):
-            trust_signals += 1
-        if abs(sentiment_score) > 0.2:
-            trust_signals += 1
-        if 30 <= market['rsi'] <= 70:
-            trust_signals += 1
-
-        # Evaluate Caution Conditions
-        if hours_remaining_float > 3:
-            caution_flags += 1
-        if market['overbought'] or market['oversold']:
-            caution_flags += 1
-        if abs(sentiment_score) < 0.05:
-            caution_flags += 1
-
-        # Determine the final advice string
-        if trust_signals >= 3 and caution_flags < 2:
-            advice_summary.append("🔐 Confidence: *GO with the vote!* (Trust: {}/5, Caution: {}/5)".format(trust_signals, caution_flags))
-        elif caution_flags >= 2:
-            advice_summary.append("🔐 Confidence: *SKIP the trade or WAIT!* (Trust: {}/5, Caution: {}/5)".format(trust_signals, caution_flags))
-        else:
-            advice_summary.append("🔐 Confidence: *Proceed with caution or wait for clearer signals.* (Trust: {}/5, Caution: {}/5)".format(trust_signals, caution_flags))
+        # Neighbouring strikes at the same expiry, from the same snapshot
+        with st.expander("🪜 Strike Ladder"):
+            ladder = cached.votes_for_grid(strike_ladder(target_price, step=ladder_step), [parsed_time],
+                                           snapshot, mode=projection_mode)
+            columns = ["target_price", "projected_price"] + (["probability"] if "probability" in ladder else []) + ["vote"]
+            st.dataframe(ladder[columns], hide_index=True, use_container_width=True)
+
+        # --- Trust/Caution advisor (scored in probo_core.advisor, memoized per data version) ---
+        advisor = cached.advice(snapshot, hours_remaining_float)
+        trust, caution = advisor["trust"], advisor["caution"]
+        trust_signals, caution_flags = advisor["trust_signals"], advisor["caution_flags"]
+        advice_summary = [advisor["summary"]]  # To collect advice for the Telegram message
+        # Logged for the track record; a ledger problem must not cost the user the advice
+        try:
+            prediction_ledger.record_vote(result, snapshot, source="app", mode=projection_mode,
+                                          market=market, advice=advisor)
+        except Exception as e:
+            metrics.inc("ledger_record_failures_total", source="app")
+            print(f"[ledger] could not record prediction: {type(e).__name__}: {e}")
 
         # Display advice in Streamlit (remains the same)
         st.markdown("---")
         st.subheader("💡 Prediction Confidence Advisor")
         st.markdown("#### ✅ Trust Signals:")
-        st.markdown(f"- Time to expiry is < 2 hours: {'**YES**' if hours_remaining_float < 2 else '**NO**'}")
-        st.markdown(f"- BTC is trending cleanly (up or down): {'**YES**' if market['bullish_trend'] or (market['ema_20'] < market['ema_50'] and df['close'].iloc[-1] < df['EMA_20'].iloc[-1]) else '**NO** (Trend unclear/Choppy)'}")
-        st.markdown(f"- Sentiment score is strongly positive/negative (>0.2): {'**YES**' if abs(sentiment_score) > 0.2 else '**NO**'} (Score: {sentiment_score:.2f})")
-        st.markdown(f"- RSI is not extreme (30-70): {'**YES**' if 30 <= market['rsi'] <= 70 else '**NO**'} (RSI: {market['rsi']:.2f})")
+        st.markdown(f"- Time to expiry is < 2 hours: {'**YES**' if trust['near_expiry'] else '**NO**'}")
+        st.markdown(f"- BTC is trending cleanly (up or down): {'**YES**' if trust['clean_trend'] else '**NO** (Trend unclear/Choppy)'}")
+        st.markdown(f"- Sentiment score is strongly positive/negative (>0.2): {'**YES**' if trust['strong_sentiment'] else '**NO**'} (Score: {sentiment_score:.2f})")
+        st.markdown(f"- RSI is not extreme (30-70): {'**YES**' if trust['calm_rsi'] else '**NO**'} (RSI: {market['rsi']:.2f})")
         st.markdown("- No major news expected: *Requires manual check*")
         st.markdown("- Candle bodies are stable (not huge wicks): *Requires visual inspection of chart*")
 
         st.markdown("#### ⚠️ Caution Flags:")
-        st.markdown(f"- Target time is > 3 hours away: {'**YES**' if hours_remaining_float > 3 else '**NO**'}")
+        st.markdown(f"- Target time is > 3 hours away: {'**YES**' if caution['far_expiry'] else '**NO**'}")
         st.markdown("- BTC just made a massive move: *Requires manual check/recent price analysis*")
-        st.markdown(f"- RSI is > 75 or < 25: {'**YES**' if market['overbought'] or market['oversold'] else '**NO**'} (RSI: {market['rsi']:.2f})")
-        st.markdown(f"- Sentiment is conflicting (score ≈ 0): {'**YES**' if abs(sentiment_score) < 0.05 else '**NO**'} (Score: {sentiment_score:.2f})")
+        st.markdown(f"- RSI is > 75 or < 25: {'**YES**' if caution['extreme_rsi'] else '**NO**'} (RSI: {market['rsi']:.2f})")
+        st.markdown(f"- Sentiment is conflicting (score ≈ 0): {'**YES**' if caution['flat_sentiment'] else '**NO**'} (Score: {sentiment_score:.2f})")
         st.markdown("- Big news coming (Fed rate hike, CPI data): *Requires manual check of news calendar*")
         st.markdown("- Candle volatility is high (huge wicks): *Requires visual inspection of chart*")
 
@@ -125,9 +145,9 @@ if predict:
         st.markdown(f"**Total Trust Signals Met**: {trust_signals}")
         st.markdown(f"**Total Caution Flags Present**: {caution_flags}")
 
-        if trust_signals >= 3 and caution_flags < 2:
+        if advisor["verdict"] == "GO":
             st.success("🔐 Pro Tip: At least 3 'Trust' signals align. **GO with the vote!**")
-        elif caution_flags >= 2:
+        elif advisor["verdict"] == "SKIP":
             st.warning("🔐 Pro Tip: 2+ 'Caution' flags are present. **SKIP the trade or WAIT!**")
         else:
             st.info("🔐 Pro Tip: Conditions are mixed. **Proceed with caution or wait for clearer signals.**")
@@ -163,14 +183,62 @@ with st.expander("🧪 Technical Indicators"):
     )
 
 # 📊 Chart
-with st.expander("📊 View Chart"):
+def _build_figure(chart_df):
+    import plotly.graph_objects as go  # only loaded once the chart is drawn
     fig = go.Figure()
-    fig.add_trace(go.Candlestick(x=df.index, open=df["open"], high=df["high"], low=df["low"], close=df["close"], name="Candles"))
-    fig.add_trace(go.Scatter(x=df.index, y=df["EMA_20"], mode='lines', name='EMA 20'))
-    fig.add_trace(go.Scatter(x=df.index, y=df["EMA_50"], mode='lines', name='EMA 50'))
+    fig.add_trace(go.Candlestick(x=chart_df.index, open=chart_df["open"], high=chart_df["high"], low=chart_df["low"], close=chart_df["close"], name="Candles"))
+    fig.add_trace(go.Scatter(x=chart_df.index, y=chart_df["EMA_20"], mode='lines', name='EMA 20'))
+    fig.add_trace(go.Scatter(x=chart_df.index, y=chart_df["EMA_50"], mode='lines', name='EMA 50'))
     fig.update_layout(height=400, xaxis_rangeslider_visible=False)
+    return fig
+
+with st.expander("📊 View Chart"):
+    timeframe = snapshot.interval
+    if resampling_enabled():
+        # Other timeframes come from the shared 1m series, so switching costs no API calls
+        timeframe = st.selectbox("Timeframe", DERIVED_INTERVALS, index=DERIVED_INTERVALS.index("1h"))
+    if timeframe == snapshot.interval:
+        # Rebuilt only when the candles or sentiment change, not on every rerun
+        fig = cached.memoize("chart", snapshot, (), lambda: _build_figure(df))
+    else:
+        chart_df = build_snapshot(interval=timeframe, limit=len(df)).candles.to_frame() if daemon_socket() \
+            else fetch_timeframe(timeframe, len(df)).to_frame()
+        fig = _build_figure(chart_df)
     st.plotly_chart(fig, use_container_width=True)
 
+# ⏱️ Where the time goes (process-wide numbers, shared by every session)
+if metrics.enabled():
+    metrics.observe("app_render", time.perf_counter() - _render_started)
+    if st.sidebar.checkbox("⏱️ Show pipeline timings"):
+        with st.expander("⏱️ Pipeline Timings", expanded=True):
+            st.dataframe(metrics.span_summary(), use_container_width=True, hide_index=True,
+                         column_config={c: st.column_config.NumberColumn(format="%.1f")
+                                        for c in ("last_ms", "mean_ms", "max_ms")})
+            values = metrics.values()
+            col1, col2, col3 = st.columns(3)
+            for col, cache in ((col1, "prediction"), (col2, "sentiment")):
+                ratio = values.get(("cache_hit_ratio", (("cache", cache),)))
+                col.metric(f"{cache.title()} cache hits", "–" if ratio is None else f"{ratio:.0%}")
+            weight = values.get(("binance_weight_used", ()))
+            col3.metric("Binance weight (1m)", "–" if weight is None else f"{weight} / {values[('binance_weight_limit', ())]}")
+
+# 📒 How past recommendations turned out (app and Telegram alerts alike)
+with st.expander("📒 Prediction Track Record"):
+    ledger = prediction_ledger.get_ledger()
+    by = st.selectbox("Group by", list(prediction_ledger.GROUPS), key="ledger_by")
+    overall = ledger.summary()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Predictions", overall["predictions"])
+    col2.metric("Resolved", overall["resolved"])
+    col3.metric("Hit rate", "–" if overall["hit_rate"] is None else f"{overall['hit_rate']:.0%}")
+    rows = ledger.hit_rates(by)
+    if rows:
+        st.dataframe(rows, use_container_width=True, hide_index=True,
+                     column_config={"hit_rate": st.column_config.NumberColumn(format="%.2f"),
+                                    "mean_abs_error": st.column_config.NumberColumn(format="%.0f")})
+    else:
+        st.caption("No predictions recorded yet.")
+
 # Add the original "Cheat Sheet" as informational sections
 st.markdown("---")
 st.subheader("🧠 BTC Probo Prediction Cheat Sheet Reference")
@@ -1,16 +1,43 @@
-import threading, schedule, time
-from flask import Flask
+import os
+import time
+from flask import Flask, Response, jsonify
 from datetime import datetime, timedelta
-from btc_data import get_current_price
-from predictor import recommend_probo_vote_for_target
+from probo_core import metrics, prediction_ledger
+from probo_core.binance_stream import start_stream, streaming_enabled
+from probo_core.market_daemon import daemon_socket
+from probo_core.market_snapshot import build_snapshot
+from probo_core.predictor import recommend_probo_votes_for_grid, strike_ladder
 from telegram_bot import send_telegram_alert
+from block_scheduler import BlockScheduler
+
+ALERT_LEAD_SECONDS = float(os.environ.get("BTC_ALERT_LEAD_SECONDS", 60))  # send this long before each block
+ALERT_TIMEOUT_SECONDS = float(os.environ.get("BTC_ALERT_TIMEOUT_SECONDS", 120))
 
 app = Flask(__name__)
+scheduler = BlockScheduler(workers=2)
 
 @app.route('/')
 def home():
     return "✅ BTC Auto Alert Bot Running (IST)"
 
+@app.route('/schedule')
+def schedule_status():
+    # Next run / block per job plus run counts (duration histograms are on /metrics)
+    return jsonify(scheduler.stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    # Prometheus text format: spans, counters, cache hit rates, Binance weight, outbox
+    if not metrics.enabled():
+        return Response("# metrics disabled (BTC_METRICS=0)\n", status=404, mimetype="text/plain")
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@metrics.register_collector
+def _collect_scheduler():
+    for name, job in scheduler.stats().items():
+        for outcome in ("runs", "errors", "timeouts", "coalesced"):
+            yield "counter", "alert_job_runs_total", job[outcome], {"job": name, "outcome": outcome}
+
 def get_next_10_min_block_ist():
     now_utc = datetime.utcnow()
     ist_now = now_utc + timedelta(hours=5, minutes=30)
@@ -26,28 +53,56 @@ def get_next_10_min_block_ist():
     target_time_utc = ist_target - timedelta(hours=5, minutes=30)
     return target_time_utc.strftime("%H:%M"), ist_target.strftime("%H:%M")
 
-def send_prediction():
-    target_time_utc, target_time_ist = get_next_10_min_block_ist()
+def block_times(block_utc):
+    # (UTC "HH:MM", IST "HH:MM") for a block boundary
+    ist = block_utc + timedelta(hours=5, minutes=30)
+    return block_utc.strftime("%H:%M"), ist.strftime("%H:%M")
 
-    result = recommend_probo_vote_for_target(target_price=64000, target_time_str=target_time_utc)
+def send_prediction(block=None):
+    # The scheduler passes the block being predicted; a manual call targets the next one
+    target_time_utc, target_time_ist = block_times(block) if block is not None else get_next_10_min_block_ist()
 
+    with metrics.span("alert", stage="snapshot"):
+        # Klines, price and news are fetched concurrently with per-source deadlines. The
+        # app's default window, so RSI/EMA (and the advisor flags logged with each
+        # alert) are computed from enough candles; the projection uses the last few.
+        snapshot = build_snapshot()
+    with metrics.span("alert", stage="predict"):
+        # Evaluate a ladder of strikes around the live price in one call
+        # The scheduler's block is the exact expiry; "HH:MM" would roll over to tomorrow
+        # when the job fires at (or just after) the boundary
+        expiry = block if block is not None else target_time_utc
+        table = recommend_probo_votes_for_grid(strike_ladder(snapshot.price), [expiry], snapshot=snapshot)
+
+    ladder = "\n".join(f"  ${row.target_price:,.0f} → *{row.vote}*" for row in table.itertuples())
     message = (
         f"📣 *BTC Auto Vote Alert*\n"
         f"🕒 Target Time (IST): *{target_time_ist}*\n"
-        f"📈 Projected: *${result['projected_price']}*\n"
-        f"💬 Sentiment: *{result['sentiment']}*\n"
-        f"✅ Vote: *{result['vote']}*"
+        f"💰 Current: *${snapshot.price}*\n"
+        f"📈 Projected: *${table['projected_price'].iloc[0]}*\n"
+        f"💬 Sentiment: *{snapshot.sentiment}*\n"
+        f"✅ Votes by strike:\n{ladder}"
     )
-    send_telegram_alert(message)
-
-def run_schedule():
-    schedule.every(10).minutes.do(send_prediction)
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    with metrics.span("alert", stage="enqueue"):
+        send_telegram_alert(message)
+    # Logged after the hand-off, and never allowed to fail the job
+    try:
+        with metrics.span("alert", stage="record"):
+            prediction_ledger.record_grid(table, snapshot, source="alert")
+    except Exception as e:
+        metrics.inc("ledger_record_failures_total", source="alert")
+        print(f"[ledger] could not record alert: {type(e).__name__}: {e}")
+    if block is not None:
+        # How far ahead of its block the alert was handed to the outbox
+        metrics.set_gauge("alert_lead_seconds", block.timestamp() - time.time())
 
 def run_flask():
     app.run(host="0.0.0.0", port=8080)
 
-threading.Thread(target=run_schedule).start()
+if streaming_enabled() and not daemon_socket():
+    start_stream("BTCUSDT", "1h")
+
+prediction_ledger.start_resolver()
+scheduler.add_job(send_prediction, lead=ALERT_LEAD_SECONDS, timeout=ALERT_TIMEOUT_SECONDS)
+scheduler.start()
 run_flask()
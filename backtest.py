@@ -0,0 +1,196 @@
+# backtest.py
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from probo_core.candle_store import CandleStore
+from probo_core.indicators import ema_series, rsi_series
+from probo_core.predictor import decide_vote, YES_MIN_SENTIMENT, PROJECTION_LOOKBACK
+from probo_core.probo_strategy import (decide_market_vote, RSI_OVERSOLD, RSI_OVERBOUGHT,
+                            BULLISH_MIN_SENTIMENT, OVERSOLD_MIN_SENTIMENT)
+
+PROBO_PAYOUT = 10.0  # a correct share settles at 10, a wrong one at 0
+
+# The live rules' settings; a sweep overrides any subset of them
+DEFAULT_PARAMS = {
+    "rsi_window": 14,
+    "rsi_oversold": RSI_OVERSOLD,
+    "rsi_overbought": RSI_OVERBOUGHT,  # passed through, but the live rule has no overbought branch
+    "ema_fast": 20,
+    "ema_slow": 50,
+    "lookback": PROJECTION_LOOKBACK,
+    "bullish_min_sentiment": BULLISH_MIN_SENTIMENT,
+    "oversold_min_sentiment": OVERSOLD_MIN_SENTIMENT,
+    "yes_min_sentiment": YES_MIN_SENTIMENT,
+    "horizon": 1,            # candles until expiry
+    "strike_offset": 0.0,    # strike = close * (1 + offset) at decision time
+    "entry_price": 5.0,      # price paid per share on the side we vote
+    "default_sentiment": 0.0,  # used where no recorded sentiment is available
+}
+
+# No rsi_overbought axis: decide_market_vote ignores it, so it would only triple the sweep
+DEFAULT_GRID = {
+    "rsi_oversold": [25, 30, 35],
+    "ema_fast": [10, 20, 30],
+    "ema_slow": [50, 100],
+    "lookback": [5, 10, 20],
+    "bullish_min_sentiment": [0.0, 0.05],
+}
+
+
+def load_closes(symbol="BTCUSDT", interval="1m", start=None, end=None):
+    store = CandleStore(symbol, interval)
+    if start is None and end is None:
+        candles = store.read()
+    else:
+        candles = store.read_range(_to_ms(start) if start else 0, _to_ms(end) if end else 2 ** 62)
+    return candles["open_time"], candles["close"]
+
+
+def load_sentiment(path, open_times, default=0.0):
+    # CSV with `timestamp` and `sentiment` columns, forward-filled onto the candle times
+    series = pd.read_csv(path, parse_dates=["timestamp"]).set_index("timestamp")["sentiment"].sort_index()
+    index = pd.to_datetime(open_times, unit="ms")
+    return series.reindex(index, method="ffill").fillna(default).to_numpy()
+
+
+def _to_ms(value):
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+class _Series:
+    # Closes plus per-window indicator caches, shared by every config run in a process
+    def __init__(self, close, sentiment=None):
+        self.close = np.asarray(close, dtype=float)
+        self.sentiment = None if sentiment is None else np.asarray(sentiment, dtype=float)
+        self.ema = lru_cache(maxsize=32)(lambda w: ema_series(self.close, w))
+        self.rsi = lru_cache(maxsize=8)(lambda w: rsi_series(self.close, w))
+
+
+def _score(vote_yes, outcome, entry_price):
+    correct = vote_yes == outcome
+    pnl = np.where(correct, PROBO_PAYOUT - entry_price, -entry_price)
+    n = len(correct)
+    return {
+        "contracts": n,
+        "yes_share": float(vote_yes.mean()) if n else np.nan,
+        "hit_rate": float(correct.mean()) if n else np.nan,
+        "pnl": float(pnl.sum()),
+        "pnl_per_contract": float(pnl.mean()) if n else np.nan,
+    }
+
+
+def run_backtest(series, params=None):
+    """Replay both decision rules over every candle and score them.
+
+    At each candle t a contract asks "close at t + horizon >= strike". The
+    predictor rule projects close[t] + mean(diff of last `lookback` closes) * horizon
+    and votes via predictor.decide_vote; the strategy rule feeds EMA/RSI at t to
+    probo_strategy.decide_market_vote. Returns {rule: metrics}.
+    """
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    close = series.close
+    h, lookback = int(p["horizon"]), int(p["lookback"])
+    if lookback < 2 or h < 1:
+        raise ValueError("lookback must be >= 2 and horizon >= 1")
+    warmup = max(p["ema_slow"], p["ema_fast"], p["rsi_window"], lookback) - 1
+    t = np.arange(warmup, len(close) - h)
+    if len(t) == 0:
+        raise ValueError("Not enough candles for the requested windows and horizon")
+
+    sentiment = series.sentiment[t] if series.sentiment is not None else np.full(len(t), p["default_sentiment"])
+    strike = close[t] * (1 + p["strike_offset"])
+    outcome = close[t + h] >= strike
+
+    # Mean of the last `lookback` - 1 diffs telescopes to this
+    avg_delta = (close[t] - close[t - lookback + 1]) / (lookback - 1)
+    projected = np.round(close[t] + avg_delta * h, 2)
+    predictor_yes = decide_vote(projected, strike, sentiment, min_sentiment=p["yes_min_sentiment"]) == "YES"
+
+    ema_fast, ema_slow, rsi = series.ema(p["ema_fast"])[t], series.ema(p["ema_slow"])[t], series.rsi(p["rsi_window"])[t]
+    strategy_yes = decide_market_vote(
+        ema_fast > ema_slow, rsi < p["rsi_oversold"], rsi > p["rsi_overbought"], sentiment,
+        bullish_min_sentiment=p["bullish_min_sentiment"], oversold_min_sentiment=p["oversold_min_sentiment"],
+    ) == "YES"
+
+    return {
+        "predictor": _score(predictor_yes, outcome, p["entry_price"]),
+        "strategy": _score(strategy_yes, outcome, p["entry_price"]),
+    }
+
+
+def _flatten(params, results):
+    row = dict(params)
+    for rule, metrics in results.items():
+        for name, value in metrics.items():
+            row[f"{rule}_{name}"] = value
+    return row
+
+
+_worker_series = None
+
+
+def _init_worker(close, sentiment):
+    global _worker_series
+    _worker_series = _Series(close, sentiment)
+
+
+def _run_config(params):
+    return _flatten(params, run_backtest(_worker_series, params))
+
+
+def sweep(close, grid=None, sentiment=None, base_params=None, processes=None):
+    """Run every combination in `grid` across a process pool; one row per config."""
+    grid = grid or DEFAULT_GRID
+    keys = list(grid)
+    configs = [{**DEFAULT_PARAMS, **(base_params or {}), **dict(zip(keys, values))} for values in product(*grid.values())]
+    processes = processes or os.cpu_count() or 1
+    # Configs sharing indicator windows land in the same chunk so each worker's cache pays off
+    configs.sort(key=lambda c: (c["ema_fast"], c["ema_slow"], c["rsi_window"]))
+    chunksize = max(1, len(configs) // (processes * 4))
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(close, sentiment)) as pool:
+        rows = list(pool.map(_run_config, configs, chunksize=chunksize))
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the predictor and probo_strategy rules on stored klines")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--start", help="e.g. 2024-01-01")
+    parser.add_argument("--end", help="exclusive, e.g. 2025-01-01")
+    parser.add_argument("--sentiment", help="CSV with timestamp,sentiment columns")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_PARAMS["horizon"], help="candles to expiry")
+    parser.add_argument("--sweep", action="store_true", help=f"sweep DEFAULT_GRID ({'/'.join(DEFAULT_GRID)})")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--out", help="write the sweep table to this CSV")
+    args = parser.parse_args()
+
+    open_times, close = load_closes(args.symbol, args.interval, args.start, args.end)
+    if len(close) == 0:
+        raise SystemExit(f"No stored {args.symbol} {args.interval} candles; backfill them first")
+    sentiment = load_sentiment(args.sentiment, open_times) if args.sentiment else None
+    print(f"{len(close):,} candles of {args.symbol} {args.interval}")
+
+    start = time.perf_counter()
+    if args.sweep:
+        table = sweep(close, sentiment=sentiment, base_params={"horizon": args.horizon}, processes=args.processes)
+        print(f"{len(table)} configs in {time.perf_counter() - start:.1f}s")
+        print(table.sort_values("strategy_pnl", ascending=False).head(10).to_string(index=False))
+        if args.out:
+            table.to_csv(args.out, index=False)
+    else:
+        results = run_backtest(_Series(close, sentiment), {"horizon": args.horizon})
+        for rule, metrics in results.items():
+            print(f"{rule:<10} " + "  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in metrics.items()))
+
+
+if __name__ == "__main__":
+    main()
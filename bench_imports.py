@@ -0,0 +1,85 @@
+# bench_imports.py
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Entry points and the modules their top-level imports pull in
+TARGETS = {
+    "bot": "auto_alerts.py",
+    "dashboard": "app.py",
+    "core": None,  # probo_core's prediction path on its own, as a library user would load it
+}
+CORE_MODULES = ["probo_core.market_snapshot", "probo_core.predictor", "probo_core.probo_strategy"]
+HEAVY_MODULES = ("pandas", "plotly", "textblob", "nltk", "feedparser", "streamlit", "flask", "ta")
+
+# Run in a fresh interpreter per sample so nothing is already imported
+PROBE = r"""
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_mb": rss_kb / 1024,
+    "modules": len(sys.modules),
+    "heavy": sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+"""
+
+
+def top_level_imports(path):
+    # Module names imported at the top level of a script (what runs before its first line of logic)
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.append(node.module)
+    return names
+
+
+def measure(modules, repeat):
+    code = PROBE.format(root=ROOT, modules=modules, heavy=HEAVY_MODULES)
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT)
+        if out.returncode != 0:
+            raise SystemExit(out.stderr)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    best = min(samples, key=lambda s: s["seconds"])
+    best["median_seconds"] = sorted(s["seconds"] for s in samples)[len(samples) // 2]
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time and RSS of the bot, dashboard and core")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for name, script in TARGETS.items():
+        modules = top_level_imports(os.path.join(ROOT, script)) if script else CORE_MODULES
+        results[name] = measure(modules, args.repeat)
+        r = results[name]
+        print(f"{name:<10} best {r['seconds'] * 1000:7.0f} ms  median {r['median_seconds'] * 1000:7.0f} ms  "
+              f"max RSS {r['max_rss_mb']:6.1f} MB  {r['modules']:5d} modules  heavy: {', '.join(r['heavy']) or '-'}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# bench_klines.py
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from probo_core.candle_store import CANDLE_DTYPE
+from probo_core.candles import Candles
+
+
+def make_payload(n):
+    # Body shaped like Binance's /api/v3/klines response
+    rng = np.random.default_rng(0)
+    close = 65000 + np.cumsum(rng.normal(0, 25, n))
+    rows = []
+    for i, c in enumerate(close):
+        t = 1_700_000_000_000 + i * 60_000
+        rows.append([t, f"{c - 3:.8f}", f"{c + 12:.8f}", f"{c - 15:.8f}", f"{c:.8f}", f"{rng.uniform(1, 50):.8f}",
+                     t + 59_999, "802345.12340000", 1234, "6.10000000", "400000.10000000", "0"])
+    return json.dumps(rows, separators=(",", ":")).encode()
+
+
+def old_path(raw):
+    # What fetch_ohlcv used to do: JSON -> 12-column frame -> astype(float) -> drop
+    df = pd.DataFrame(json.loads(raw), columns=[
+        "timestamp", "open", "high", "low", "close", "volume",
+        "close_time", "quote_asset_volume", "num_trades",
+        "taker_buy_base", "taker_buy_quote", "ignore",
+    ])
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+    df.set_index("timestamp", inplace=True)
+    df = df.astype(float)
+    return df[["open", "high", "low", "close", "volume"]]
+
+
+def new_path(raw, dtype):
+    return Candles.from_klines(raw, dtype=dtype)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kline decode benchmark: DataFrame path vs parse_klines/Candles")
+    parser.add_argument("--candles", type=int, default=1000, help="rows per payload (Binance caps a page at 1000)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    raw = make_payload(args.candles)
+    reference = old_path(raw)
+    parsed = new_path(raw, np.float64)
+    assert np.allclose(parsed.close, reference["close"].to_numpy())
+
+    old = best_of(lambda: old_path(raw), args.repeat)
+    new = best_of(lambda: new_path(raw, np.float64), args.repeat)
+    new32 = best_of(lambda: new_path(raw, np.float32), args.repeat)
+    to_frame = best_of(lambda: new_path(raw, np.float64).to_frame(), args.repeat)
+
+    print(f"{args.candles:,} candles, {len(raw) / 1024:.0f} KiB payload")
+    print(f"DataFrame path      {old * 1000:8.2f} ms")
+    print(f"Candles float64     {new * 1000:8.2f} ms  ({old / new:.1f}x)")
+    print(f"Candles float32     {new32 * 1000:8.2f} ms")
+    print(f"Candles + to_frame  {to_frame * 1000:8.2f} ms")
+    print(f"memory per candle: {CANDLE_DTYPE.itemsize} B float64 records, "
+          f"{2 * 8 + 5 * 4} B float32 Candles, {reference.memory_usage(deep=True).sum() / args.candles:.0f} B DataFrame")
+
+
+if __name__ == "__main__":
+    main()
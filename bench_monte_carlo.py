@@ -0,0 +1,40 @@
+# bench_monte_carlo.py
+
+import argparse
+import time
+
+import numpy as np
+
+from probo_core.monte_carlo import DEFAULT_PATHS, LATENCY_BUDGET_MS, hit_probabilities
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo hit-probability throughput benchmark")
+    parser.add_argument("--paths", type=int, default=DEFAULT_PATHS)
+    parser.add_argument("--expiries", type=int, default=12, help="10-minute expiries starting 10 minutes out")
+    parser.add_argument("--strikes", type=int, default=41, help="strikes in $250 steps around the price")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    price, mu, sigma = 65000.0, 0.0001, 0.006
+    hours = np.arange(1, args.expiries + 1) / 6
+    strikes = price + 250 * (np.arange(args.strikes) - args.strikes // 2)
+
+    hit_probabilities(price, strikes, hours, mu, sigma, n_paths=args.paths, seed=0)  # warm-up
+    timings = []
+    for i in range(args.repeat):
+        start = time.perf_counter()
+        table = hit_probabilities(price, strikes, hours, mu, sigma, n_paths=args.paths, seed=i)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    cells = args.paths * args.expiries
+    print(f"{args.paths:,} paths x {args.expiries} expiries x {args.strikes} strikes")
+    print(f"best {best * 1000:.1f} ms, median {np.median(timings) * 1000:.1f} ms (budget {LATENCY_BUDGET_MS} ms)")
+    print(f"throughput {cells / best / 1e6:.1f} M path-steps/s, {len(table) / best:,.0f} contracts/s")
+    if best * 1000 > LATENCY_BUDGET_MS:
+        raise SystemExit("over latency budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+# bench_pipeline.py
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from replay import REPLAY_DIR, start_replay
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SYMBOL = "BTCUSDT"
+INTERVAL = "1m"
+WINDOWS = (100, 1_000, 10_000, 100_000)
+TARGET_OFFSET = 250     # strike this far above the last close
+TARGET_TIME = "23:00"   # UTC, as recommend_probo_vote_for_target expects
+MIN_SAMPLES = 3
+STAGE_BUDGET = 10.0     # seconds of sampling per stage once MIN_SAMPLES are in
+REGRESSION_THRESHOLD = 1.25
+
+
+def percentiles(samples):
+    ms = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "mean_ms": ms.mean(), "min_ms": ms.min(), "max_ms": ms.max()}
+
+
+def measure(run, setup=None, n=None, repeat=20, budget=STAGE_BUDGET):
+    # One untimed warm-up (lazy imports, first connection), then `repeat` timed
+    # runs or as many as fit in `budget`, then one traced run for peak memory
+    # (tracemalloc slows everything down, so it never overlaps the timings).
+    if setup:
+        setup()
+    run()
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat and (len(samples) < MIN_SAMPLES or time.perf_counter() - started < budget):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    result = {"n": n, "samples": len(samples), **percentiles(samples), "peak_kib": peak / 1024}
+    mean = result["mean_ms"] / 1000
+    result["ops_per_s"] = 1 / mean
+    result["candles_per_s"] = n / mean if n else None
+    return result
+
+
+class Pipeline:
+    """The prediction pipeline against the replay server, stage by stage.
+
+    Windows up to one klines page go through fetch_ohlcv (store sync); longer
+    ones are backfilled into the store and read from it, which is how a long
+    history gets into the app.
+    """
+
+    def __init__(self, workers):
+        # Imported here: the replay environment must be in place first
+        from probo_core import btc_data, prediction_cache, sentiment
+        from probo_core.backfill import backfill
+        from probo_core.candle_store import CandleStore
+        from probo_core.candles import Candles
+        from probo_core.market_snapshot import MarketSnapshot, build_local_snapshot
+        from probo_core.predictor import recommend_probo_vote_for_target
+        from probo_core.sentiment_cache import SentimentCache
+
+        self.btc_data, self.cached, self.sentiment = btc_data, prediction_cache, sentiment
+        self.backfill, self.Candles, self.SentimentCache = backfill, Candles, SentimentCache
+        self.MarketSnapshot, self.build_local_snapshot = MarketSnapshot, build_local_snapshot
+        self.recommend = recommend_probo_vote_for_target
+        self.store = CandleStore(SYMBOL, INTERVAL)
+        self.workers = workers
+
+    def reset(self):
+        # Cold start: empty candle store, indicator engines and prediction memo
+        self.store.clear()
+        self.btc_data._indicator_cache.clear()
+        self.cached.get_cache().clear()
+
+    def reset_sentiment(self):
+        # Forget every headline score so the next call runs the scorer again
+        self.sentiment._aggregates.clear()
+        self.sentiment._latest.clear()
+        self.sentiment._cache = self.SentimentCache(path=None, namespace=self.sentiment._cache.namespace)
+
+    def load_candles(self, n):
+        if n <= self.btc_data.KLINES_MAX_LIMIT:
+            return self.btc_data.fetch_candles(SYMBOL, INTERVAL, n)
+        if len(self.store) < n:
+            step = self.btc_data.INTERVAL_MS[INTERVAL]
+            start = (int(time.time() * 1000) // step - n + 1) * step
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.backfill(SYMBOL, INTERVAL, start=start, workers=self.workers, resume=False)
+        return self.Candles.from_records(self.store.read(n))
+
+    def fetch_ohlcv(self, n):
+        if n <= self.btc_data.KLINES_MAX_LIMIT:
+            return self.btc_data.fetch_ohlcv(SYMBOL, INTERVAL, n)
+        return self.load_candles(n).to_frame()
+
+    def snapshot(self, n):
+        if n <= self.btc_data.KLINES_MAX_LIMIT:
+            return self.build_local_snapshot(SYMBOL, INTERVAL, n)
+        candles = self.btc_data.add_candle_indicators(self.load_candles(n))
+        return self.MarketSnapshot(
+            symbol=SYMBOL, interval=INTERVAL, candles=candles,
+            price=self.btc_data.get_current_price(SYMBOL),
+            sentiment=self.sentiment.get_bitcoin_sentiment(),
+            sentiment_id=self.sentiment.sentiment_refresh_id(),
+        )
+
+    def predict(self, n):
+        # One dashboard / alert tick: snapshot, market read, vote and advisor verdict
+        snapshot = self.snapshot(n)
+        target = float(snapshot.price) + TARGET_OFFSET
+        self.cached.market_conditions(snapshot)
+        result = self.cached.vote_for_target(target, TARGET_TIME, snapshot)
+        self.cached.advice(snapshot, result["hours_remaining"])
+        return result
+
+
+def run_window(pipeline, n, repeat, budget):
+    results = {}
+
+    def bench(name, run, setup=None):
+        results[name] = measure(run, setup, n=n, repeat=repeat, budget=budget)
+
+    bench("fetch_ohlcv", lambda: pipeline.fetch_ohlcv(n), setup=pipeline.reset)
+    bench("fetch_ohlcv_warm", lambda: pipeline.fetch_ohlcv(n))
+
+    # add_technical_indicators writes its columns into the frame, so every run gets a fresh copy
+    frame, work = pipeline.fetch_ohlcv(n), {}
+
+    def fresh_frame(cold):
+        if cold:
+            pipeline.btc_data._indicator_cache.clear()
+        work["df"] = frame.copy()
+
+    bench("add_technical_indicators", lambda: pipeline.btc_data.add_technical_indicators(work["df"]),
+          setup=lambda: fresh_frame(cold=True))
+    bench("add_technical_indicators_warm", lambda: pipeline.btc_data.add_technical_indicators(work["df"]),
+          setup=lambda: fresh_frame(cold=False))
+
+    snapshot = pipeline.snapshot(n)
+    target = float(snapshot.price) + TARGET_OFFSET
+    for mode in ("linear", "monte_carlo"):
+        bench(f"recommend_probo_vote_for_target[{mode}]",
+              lambda: pipeline.recommend(target, TARGET_TIME, snapshot=snapshot, mode=mode))
+
+    bench("end_to_end", lambda: pipeline.predict(n), setup=pipeline.reset)
+    bench("end_to_end_warm", lambda: pipeline.predict(n))
+    return results
+
+
+def run_app(repeat, budget):
+    # Full Streamlit script run (fetch + analysis + chart) through AppTest
+    from streamlit.testing.v1 import AppTest
+
+    def render():
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120).run()
+        if at.exception:
+            raise RuntimeError(f"app.py raised: {at.exception[0].value}")
+    return measure(render, repeat=repeat, budget=budget)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    # p50 ratios against a previous --out file; returns the stages that got slower than `threshold`
+    regressions = []
+    print(f"\nvs baseline (commit {baseline['meta'].get('commit')}, {baseline['meta'].get('created')}):")
+    print(f"{'stage':<50}{'p50 before':>12}{'p50 now':>12}{'ratio':>8}")
+    for key, now in results.items():
+        before = baseline["results"].get(key)
+        if before is None:
+            continue
+        ratio = now["p50_ms"] / before["p50_ms"] if before["p50_ms"] else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{key:<50}{before['p50_ms']:>12.2f}{now['p50_ms']:>12.2f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def print_results(results):
+    print(f"{'stage':<50}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'candles/s':>16}{'peak KiB':>11}")
+    for key, r in results.items():
+        candles = f"{r['candles_per_s']:,.0f}" if r["candles_per_s"] else "-"
+        print(f"{key:<50}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['ops_per_s']:>10.1f}"
+              f"{candles:>16}{r['peak_kib']:>11,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prediction pipeline latency / throughput / memory benchmark (offline)")
+    parser.add_argument("--windows", type=int, nargs="+", default=list(WINDOWS), help="candles per window")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per stage (fewer if --budget runs out)")
+    parser.add_argument("--budget", type=float, default=STAGE_BUDGET, help="seconds of sampling per stage")
+    parser.add_argument("--fixtures", default=REPLAY_DIR, help="recorded fixtures (synthetic data if empty)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="emulated network latency per request")
+    parser.add_argument("--workers", type=int, default=8, help="backfill workers for windows over one page")
+    parser.add_argument("--app", action="store_true", help="also time a full app.py render through AppTest")
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON from an earlier --out run to compare p50s against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="p50 ratio over baseline that counts as a regression")
+    args = parser.parse_args()
+
+    # Throwaway store / sentiment cache, no stream, resampler or daemon, upstreams on the replay server
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    os.environ["BTC_CANDLE_STORE_DIR"] = os.path.join(workdir, "candles")
+    os.environ["BTC_SENTIMENT_CACHE"] = os.path.join(workdir, "sentiment.json")
+    for name in ("BTC_STREAM", "BTC_RESAMPLE", "BTC_MARKET_SOCKET"):
+        os.environ.pop(name, None)
+    server = start_replay(args.fixtures, SYMBOL, INTERVAL, candles=max(args.windows), latency=args.latency_ms / 1000)
+    available = len(server.klines)
+    pipeline = Pipeline(args.workers)
+
+    results = {}
+    sentiment = lambda: pipeline.sentiment.fetch_news_sentiment()
+    results["fetch_news_sentiment"] = measure(sentiment, setup=pipeline.reset_sentiment, repeat=args.repeat,
+                                              budget=args.budget)
+    results["fetch_news_sentiment_warm"] = measure(sentiment, repeat=args.repeat, budget=args.budget)
+
+    for n in sorted(args.windows):
+        if n > available:
+            print(f"[bench] skipping {n:,} candles: fixtures only hold {available:,}")
+            continue
+        print(f"[bench] {n:,} candles ...")
+        for name, result in run_window(pipeline, n, args.repeat, args.budget).items():
+            results[f"{name}@{n}"] = result
+
+    if args.app:
+        results["app_render"] = run_app(min(args.repeat, 5), args.budget)
+    server.stop()
+
+    print_results(results)
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "fixtures": "recorded" if server.recorded else "synthetic",
+            "latency_ms": args.latency_ms,
+            "windows": sorted(args.windows),
+            "upstream_requests": dict(server.requests),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[bench] results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(f"{len(regressions)} stage(s) slower than {args.threshold:.2f}x baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# bench_sentiment.py
+
+import argparse
+import os
+import time
+
+import numpy as np
+from textblob import TextBlob
+
+from probo_core.sentiment_batch import COMPAT_TOLERANCE, score_batch
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "headlines.txt")
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def textblob_scores(headlines):
+    # The current fetch_news_sentiment path: one TextBlob per headline
+    return np.array([TextBlob(h).sentiment.polarity for h in headlines])
+
+
+def rate(fn, headlines, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(headlines)
+        best = min(best, time.perf_counter() - start)
+    return len(headlines) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headline sentiment scoring benchmark")
+    parser.add_argument("--size", type=int, default=20000, help="headlines per batch (corpus is repeated)")
+    parser.add_argument("--textblob-size", type=int, default=2000, help="headlines for the slower TextBlob path")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    batch = (corpus * (args.size // len(corpus) + 1))[:args.size]
+
+    # Accuracy of compat mode against TextBlob on the untouched corpus
+    reference = textblob_scores(corpus)
+    error = np.abs(score_batch(corpus, mode="compat") - reference)
+    fast_error = np.abs(score_batch(corpus, mode="fast") - reference)
+
+    textblob_rate = rate(textblob_scores, batch[:args.textblob_size], repeat=1)
+    compat_rate = rate(lambda h: score_batch(h, mode="compat"), batch)
+    fast_rate = rate(lambda h: score_batch(h, mode="fast"), batch)
+
+    print(f"Corpus: {len(corpus)} headlines ({CORPUS_PATH})")
+    print(f"{'path':<10}{'headlines/s':>14}{'speedup':>10}{'max |err|':>12}{'mean |err|':>12}")
+    print(f"{'textblob':<10}{textblob_rate:>14,.0f}{1:>10.1f}{0:>12.4f}{0:>12.4f}")
+    print(f"{'compat':<10}{compat_rate:>14,.0f}{compat_rate / textblob_rate:>10.1f}{error.max():>12.4f}{error.mean():>12.4f}")
+    print(f"{'fast':<10}{fast_rate:>14,.0f}{fast_rate / textblob_rate:>10.1f}{fast_error.max():>12.4f}{fast_error.mean():>12.4f}")
+
+    if error.max() > COMPAT_TOLERANCE:
+        raise SystemExit(f"compat mode exceeds tolerance {COMPAT_TOLERANCE}: {error.max():.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# block_scheduler.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from probo_core import metrics
+
+IST_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+BLOCK_SECONDS = 600  # Probo's 10-minute blocks
+MISFIRE_GRACE_SECONDS = 5.0  # a run may start this late after its boundary before it counts as missed
+
+
+def next_boundary(now=None, block_seconds=BLOCK_SECONDS, offset_seconds=IST_OFFSET_SECONDS, lead=0.0):
+    # Next block boundary (epoch seconds) whose fire time, boundary - lead, is still ahead of `now`.
+    # Boundaries are aligned in local (IST) wall-clock time, not to when the process started.
+    now = time.time() if now is None else now
+    local = now + offset_seconds + lead
+    boundary = (local // block_seconds + 1) * block_seconds - offset_seconds
+    return boundary
+
+
+class Job:
+    def __init__(self, fn, name, block_seconds, lead, timeout, offset_seconds):
+        self.fn = fn
+        self.name = name
+        self.block_seconds = block_seconds
+        self.lead = lead
+        self.timeout = timeout
+        self.offset_seconds = offset_seconds
+        self.last_duration = None     # seconds; the histogram is probo_span_duration_seconds{span="scheduler_job"}
+        self.runs = self.errors = self.timeouts = self.coalesced = 0
+        self.last_error = None
+        self.boundary = None          # boundary of the next run
+        self._future = None
+        self._started = None
+        self._timed_out = False
+
+    @property
+    def fire_at(self):
+        return self.boundary - self.lead
+
+    def schedule_next(self, now):
+        self.boundary = next_boundary(now, self.block_seconds, self.offset_seconds, self.lead)
+
+    @property
+    def running(self):
+        return self._future is not None and not self._future.done()
+
+    def stats(self):
+        return {
+            "next_run": _iso(self.fire_at) if self.boundary is not None else None,
+            "next_block": _iso(self.boundary) if self.boundary is not None else None,
+            "running": self.running,
+            "runs": self.runs,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "coalesced": self.coalesced,
+            "last_error": self.last_error,
+            "last_duration_seconds": self.last_duration,
+        }
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="milliseconds")
+
+
+class BlockScheduler:
+    """Runs jobs at exact wall-clock block boundaries (minus a lead time) on a worker pool.
+
+    Fire times are recomputed from the clock after every run, so job duration
+    never shifts the schedule. A run that comes due while the previous one is
+    still going, or runs missed while the process was stalled, are coalesced
+    into the next boundary rather than fired late or back to back. A job past
+    its timeout is reported and no longer holds back later runs; Python
+    threads cannot be killed, so it finishes in the background.
+    """
+
+    def __init__(self, workers=4):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="block-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add_job(self, fn, name=None, block_seconds=BLOCK_SECONDS, lead=0.0, timeout=None,
+                offset_seconds=IST_OFFSET_SECONDS):
+        # `fn(boundary)` is called with the block boundary it runs for, as an aware UTC datetime
+        if not 0 <= lead < block_seconds:
+            raise ValueError("lead must be in [0, block_seconds)")
+        job = Job(fn, name or fn.__name__, block_seconds, lead, timeout, offset_seconds)
+        job.schedule_next(time.time())
+        with self._lock:
+            self._jobs[job.name] = job
+        self._wake.set()
+        return job
+
+    def next_run(self, name=None):
+        # Next fire time (epoch seconds) of one job, or of the earliest job
+        with self._lock:
+            jobs = [self._jobs[name]] if name else list(self._jobs.values())
+        return min((j.fire_at for j in jobs), default=None)
+
+    def stats(self):
+        with self._lock:
+            return {name: job.stats() for name, job in self._jobs.items()}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="block-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, wait=False):
+        self._stopped.set()
+        self._wake.set()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            self._check_timeouts()
+            now = time.time()
+            with self._lock:
+                due = [j for j in self._jobs.values() if j.fire_at <= now]
+            for job in due:
+                self._dispatch(job, now)
+
+            wait = self.next_run()
+            wait = 1.0 if wait is None else wait - time.time()
+            # Wake early for pending timeouts; otherwise sleep right up to the fire time
+            with self._lock:
+                deadlines = [j._started + j.timeout - time.perf_counter() for j in self._jobs.values()
+                             if j.running and j.timeout and not j._timed_out]
+            self._wake.wait(max(0.0, min([wait, *deadlines])))
+            self._wake.clear()
+
+    def _dispatch(self, job, now):
+        boundary = job.boundary
+        job.schedule_next(now)
+        if now > boundary + MISFIRE_GRACE_SECONDS:
+            # Woke up well after the block started (process stalled / clock jumped):
+            # everything missed collapses into the next boundary
+            missed = int((now - boundary - MISFIRE_GRACE_SECONDS) // job.block_seconds) + 1
+            job.coalesced += missed
+            print(f"[scheduler] {job.name}: {missed} missed run(s) coalesced into {_iso(job.boundary)}")
+            return
+        if job.running and not job._timed_out:
+            job.coalesced += 1
+            print(f"[scheduler] {job.name}: previous run still going, skipping block {_iso(boundary)}")
+            return
+
+        job.runs += 1
+        job._started, job._timed_out = time.perf_counter(), False
+        started = job._started
+
+        def finished(future):
+            job.last_duration = time.perf_counter() - started
+            error = future.exception() if not future.cancelled() else None
+            metrics.observe("scheduler_job", job.last_duration, error=error is not None, job=job.name)
+            if error is not None:
+                job.errors += 1
+                job.last_error = f"{type(error).__name__}: {error}"
+                print(f"[scheduler] {job.name} failed: {job.last_error}")
+
+        try:
+            job._future = self._pool.submit(job.fn, datetime.fromtimestamp(boundary, timezone.utc))
+        except RuntimeError:
+            return  # pool shut down
+        job._future.add_done_callback(finished)
+
+    def _check_timeouts(self):
+        now = time.perf_counter()
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if job.running and job.timeout and not job._timed_out and now - job._started > job.timeout:
+                job._timed_out = True
+                job.timeouts += 1
+                print(f"[scheduler] {job.name} exceeded its {job.timeout}s timeout")
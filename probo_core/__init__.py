@@ -0,0 +1,8 @@
+# probo_core/__init__.py
+#
+# Headless core of the predictor: market data (Binance client, candle store,
+# streams, snapshots), indicators, sentiment and prediction logic. Nothing in
+# here imports Streamlit, Flask or plotly, and pandas / textblob / feedparser
+# are only imported by the functions that need them, so a bot that just sends
+# alerts starts fast. Import the submodules directly, e.g.
+# `from probo_core.predictor import recommend_probo_votes_for_grid`.
@@ -0,0 +1,53 @@
+# advisor.py
+
+# Thresholds of the "Prediction Confidence Advisor" cheat sheet
+TRUST_MAX_HOURS = 2          # expiry this close makes the projection more reliable
+CAUTION_MIN_HOURS = 3        # ... and this far out makes it less
+STRONG_SENTIMENT = 0.2
+FLAT_SENTIMENT = 0.05
+RSI_CALM_RANGE = (30, 70)
+
+VERDICTS = ("GO", "CAUTION", "SKIP")
+VERDICT_TEXT = {
+    "GO": "GO with the vote!",
+    "CAUTION": "Proceed with caution or wait for clearer signals.",
+    "SKIP": "SKIP the trade or WAIT!",
+}
+
+
+def score_advice(market, last_close, sentiment, hours_remaining):
+    """Trust signals / caution flags for one recommendation and the resulting verdict.
+
+    `market` is interpret_market_conditions() output and `last_close` the
+    latest candle close. Only the checks that can be automated are scored
+    (out of 5 each, as on the cheat sheet).
+    """
+    clean_trend = bool(market["bullish_trend"] or (market["ema_20"] < market["ema_50"] and last_close < market["ema_20"]))
+    trust = {
+        "near_expiry": hours_remaining < TRUST_MAX_HOURS,
+        "clean_trend": clean_trend,
+        "strong_sentiment": abs(sentiment) > STRONG_SENTIMENT,
+        "calm_rsi": RSI_CALM_RANGE[0] <= market["rsi"] <= RSI_CALM_RANGE[1],
+    }
+    caution = {
+        "far_expiry": hours_remaining > CAUTION_MIN_HOURS,
+        "extreme_rsi": bool(market["overbought"] or market["oversold"]),
+        "flat_sentiment": abs(sentiment) < FLAT_SENTIMENT,
+    }
+    trust_signals, caution_flags = sum(trust.values()), sum(caution.values())
+
+    if trust_signals >= 3 and caution_flags < 2:
+        verdict = "GO"
+    elif caution_flags >= 2:
+        verdict = "SKIP"
+    else:
+        verdict = "CAUTION"
+
+    return {
+        "trust": trust,
+        "caution": caution,
+        "trust_signals": trust_signals,
+        "caution_flags": caution_flags,
+        "verdict": verdict,
+        "summary": f"🔐 Confidence: *{VERDICT_TEXT[verdict]}* (Trust: {trust_signals}/5, Caution: {caution_flags}/5)",
+    }
@@ -0,0 +1,154 @@
+# backfill.py
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from .binance_client import BinanceClient, get_client
+from .btc_data import INTERVAL_MS, KLINES_MAX_LIMIT
+from .candle_store import CandleStore
+from .candles import parse_klines
+
+MAX_WORKERS = 8
+FLUSH_PAGES = 50  # pages per store write / checkpoint
+
+
+def plan_pages(start_ms, end_ms, step, page_size=KLINES_MAX_LIMIT):
+    # [start, end) split into page-sized [page_start, page_end) ranges aligned to the interval
+    start_ms = -(-start_ms // step) * step
+    span = page_size * step
+    return [(s, min(s + span, end_ms)) for s in range(start_ms, end_ms, span)]
+
+
+class Checkpoint:
+    """Completed page starts for one backfill range, saved next to the candle store.
+
+    An open-ended range (end_ms None, i.e. "until now") picks up the end saved by
+    the run it resumes, so an interrupted default run carries on where it stopped.
+    """
+
+    def __init__(self, store, start_ms, end_ms=None):
+        self.path = store.path.replace(".bin", ".backfill.json")
+        self.range = [start_ms, end_ms]
+        self.done = set()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        start_ms, end_ms = saved.get("range") or (None, None)
+        if start_ms == self.range[0] and self.range[1] in (None, end_ms):
+            self.range = [start_ms, end_ms]
+            self.done = set(saved["done"])
+        else:
+            print(f"[backfill] checkpoint is for range {saved.get('range')}, starting over")
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"range": self.range, "done": sorted(self.done)}, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def backfill(symbol="BTCUSDT", interval="1m", start=None, end=None, workers=MAX_WORKERS, client=None, resume=True,
+             checkpoint=True, quiet=False):
+    """Download [start, end) klines into the candle store; returns candles written.
+
+    Pages are fetched concurrently (the shared client keeps us inside Binance's
+    weight budget) but written in order, in batches, so the store stays sorted
+    and the checkpoint only ever covers data that is on disk. In-process callers
+    filling a short range (the resampler) pass checkpoint=False, quiet=True.
+    """
+    step = INTERVAL_MS[interval]
+    client = client or get_client()
+    log = (lambda *args: None) if quiet else print
+    start_ms = _to_ms(start)
+    end_ms = _to_ms(end) if end is not None else None
+    store = CandleStore(symbol, interval)
+    progress = Checkpoint(store, start_ms, end_ms) if checkpoint else None
+    if progress is not None and resume:
+        progress.load()
+        end_ms = progress.range[1]
+    if end_ms is None:
+        end_ms = int(time.time() * 1000)
+        if progress is not None:
+            progress.range[1] = end_ms
+    done = progress.done if progress is not None else set()
+
+    pages = [p for p in plan_pages(start_ms, end_ms, step) if p[0] not in done]
+    if not pages:
+        log("[backfill] nothing to do")
+        return 0
+    log(f"[backfill] {symbol} {interval}: {len(pages)} pages with {workers} workers "
+        f"({len(done)} already done)")
+
+    def fetch_page(page):
+        page_start, page_end = page
+        records = parse_klines(client.klines(symbol, interval, limit=KLINES_MAX_LIMIT, start_time=page_start,
+                                             end_time=page_end - 1, raw=True))
+        return records[(records["open_time"] >= page_start) & (records["open_time"] < page_end)]
+
+    results, next_page, written = {}, 0, 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        futures = {pool.submit(fetch_page, page): i for i, page in enumerate(pages)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            # Flush the contiguous run of finished pages once it is big enough (or at the end)
+            ready = next_page
+            while ready in results:
+                ready += 1
+            if ready - next_page >= FLUSH_PAGES or ready == len(pages):
+                batch = [results.pop(i) for i in range(next_page, ready)]
+                records = np.concatenate(batch)
+                store.upsert(records)
+                written += len(records)
+                if progress is not None:
+                    progress.done.update(pages[i][0] for i in range(next_page, ready))
+                    progress.save()
+                next_page = ready
+                elapsed = time.perf_counter() - started
+                log(f"[backfill] {next_page}/{len(pages)} pages, {written:,} candles, "
+                      f"{written / max(elapsed, 1e-9):,.0f} candles/s, weight {client.used_weight}")
+
+    if progress is not None:
+        progress.clear()
+    return written
+
+
+def _to_ms(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    import pandas as pd
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill historical klines into the local candle store")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1m", choices=sorted(INTERVAL_MS, key=INTERVAL_MS.get))
+    parser.add_argument("--start", required=True, help="inclusive, e.g. 2024-01-01")
+    parser.add_argument("--end", help="exclusive, defaults to now")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--weight-limit", type=int, help="cap request weight per minute below Binance's limit")
+    parser.add_argument("--no-resume", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    client = BinanceClient(weight_limit=args.weight_limit) if args.weight_limit else None
+    started = time.perf_counter()
+    written = backfill(args.symbol, args.interval, args.start, args.end, workers=args.workers,
+                       client=client, resume=not args.no_resume)
+    print(f"Done: {written:,} candles in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# binance_client.py
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import metrics
+
+BINANCE_BASE_URL = os.environ.get("BINANCE_BASE_URL", "https://api.binance.com")
+
+# Binance spot allows 6000 request weight per minute per IP; stay below it so we
+# never get the 429 (and, if ignored, the 418 IP ban).
+WEIGHT_LIMIT_PER_MINUTE = 6000
+WEIGHT_SAFETY_RATIO = 0.9
+ENDPOINT_WEIGHTS = {
+    "/api/v3/klines": 2,
+    "/api/v3/ticker/price": 2,
+}
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BinanceClient:
+    """Shared Binance REST client.
+
+    One pooled keep-alive session, bounded timeouts, retry with backoff on
+    connection errors and 5xx, throttling on the X-MBX-USED-WEIGHT-1M header,
+    and single-flight coalescing: concurrent identical GETs share one request.
+    Responses are shared between callers, so treat them as read-only.
+    """
+
+    def __init__(self, base_url=None, timeout=(3.05, 10), max_retries=3, backoff_factor=0.5,
+                 pool_size=16, weight_limit=WEIGHT_LIMIT_PER_MINUTE):
+        self.base_url = (base_url or BINANCE_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.weight_limit = weight_limit
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+            # Let 429s through: _request backs off every thread on Retry-After, where
+            # urllib3 would sleep in this one while the others kept calling
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._weight_lock = threading.Lock()
+        self._weight_minute = 0
+        self._used_weight = 0
+        self._pending_weight = 0
+        self._blocked_until = 0.0
+
+    # --- weight accounting -------------------------------------------------
+
+    @property
+    def used_weight(self):
+        with self._weight_lock:
+            return self._used_weight if self._weight_minute == int(time.time() // 60) else 0
+
+    def _reserve_weight(self, weight):
+        # Block until `weight` fits in the current minute's budget, then claim it
+        budget = self.weight_limit * WEIGHT_SAFETY_RATIO
+        while True:
+            with self._weight_lock:
+                now = time.time()
+                minute = int(now // 60)
+                if minute != self._weight_minute:
+                    self._weight_minute, self._used_weight = minute, 0
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._used_weight + weight > budget:
+                    wait = (minute + 1) * 60 - now
+                else:
+                    self._used_weight += weight
+                    self._pending_weight += weight
+                    return
+            metrics.inc("binance_throttle_seconds_total", min(wait, 60))
+            time.sleep(min(wait, 60))
+
+    def _record_response(self, response, weight):
+        used = response.headers.get("X-MBX-USED-WEIGHT-1M") or response.headers.get("X-MBX-USED-WEIGHT")
+        with self._weight_lock:
+            self._pending_weight -= weight
+            if used is not None:
+                # The server count is authoritative; add back reservations still in flight
+                self._weight_minute = int(time.time() // 60)
+                self._used_weight = int(used) + self._pending_weight
+            if response.status_code in (418, 429):
+                retry_after = float(response.headers.get("Retry-After", 60))
+                self._blocked_until = max(self._blocked_until, time.time() + retry_after)
+
+    # --- requests ----------------------------------------------------------
+
+    def _request(self, path, params, weight, raw=False):
+        for attempt in range(self.max_retries + 1):
+            self._reserve_weight(weight)
+            try:
+                with metrics.span("binance_http", path=path):
+                    response = self.session.get(self.base_url + path, params=params, timeout=self.timeout)
+            except Exception:
+                with self._weight_lock:
+                    self._pending_weight -= weight
+                raise
+            self._record_response(response, weight)
+            metrics.inc("binance_responses_total", path=path, status=response.status_code)
+            # 429 asks us to back off for Retry-After; 418 means we are banned, so give up
+            if response.status_code == 429 and attempt < self.max_retries:
+                continue
+            response.raise_for_status()
+            return response.content if raw else response.json()
+
+    def get(self, path, params=None, weight=None, raw=False):
+        # raw=True returns the undecoded response body (see candles.parse_klines)
+        params = params or {}
+        if weight is None:
+            weight = ENDPOINT_WEIGHTS.get(path, 1)
+        key = (path, tuple(sorted(params.items())), raw)
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InFlight()
+
+        if not leader:
+            metrics.inc("binance_coalesced_total", path=path)
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._request(path, params, weight, raw)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    def klines(self, symbol, interval, limit=100, start_time=None, end_time=None, raw=False):
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = int(start_time)
+        if end_time is not None:
+            params["endTime"] = int(end_time)
+        return self.get("/api/v3/klines", params, raw=raw)
+
+    def ticker_price(self, symbol):
+        return float(self.get("/api/v3/ticker/price", {"symbol": symbol})["price"])
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = BinanceClient()
+        return _client
+
+
+def set_client(client):
+    # Swap the shared client, e.g. for one pointed at a local stand-in server
+    global _client
+    with _client_lock:
+        _client = client
+
+
+@metrics.register_collector
+def _collect_weight():
+    client = _client
+    if client is not None:
+        yield "gauge", "binance_weight_used", client.used_weight, {}
+        yield "gauge", "binance_weight_limit", client.weight_limit, {}
@@ -0,0 +1,177 @@
+# binance_stream.py
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from .candle_store import CANDLE_DTYPE, CandleStore
+
+try:
+    import websocket  # websocket-client
+except ImportError:
+    websocket = None
+
+BINANCE_WS_URL = os.environ.get("BINANCE_WS_URL", "wss://stream.binance.com:9443")
+STREAM_STALE_AFTER = 15  # seconds without a message before readers fall back to REST
+STREAM_HISTORY = 500     # candles kept in memory per stream
+RECONNECT_MAX_DELAY = 30
+
+
+class MarketStream:
+    """Background kline + aggTrade WebSocket feed for one symbol/interval.
+
+    Keeps the latest trade price and a rolling candle window (the last one
+    still forming) in memory. Closed candles are written to the candle store,
+    and after every (re)connect the window is backfilled over REST so gaps from
+    a disconnect are filled before live messages are applied.
+    """
+
+    def __init__(self, symbol="BTCUSDT", interval="1h", ws_url=None, history=STREAM_HISTORY):
+        self.symbol = symbol.upper()
+        self.interval = interval
+        self.history = history
+        stream = self.symbol.lower()
+        self.url = f"{(ws_url or BINANCE_WS_URL).rstrip('/')}/stream?streams={stream}@kline_{interval}/{stream}@aggTrade"
+        self.store = CandleStore(self.symbol, interval)
+
+        self._lock = threading.Lock()
+        self._candles = np.empty(0, dtype=CANDLE_DTYPE)
+        self._price = None
+        self._last_message = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._ws = None
+        self.reconnects = 0
+
+    # --- readers -----------------------------------------------------------
+
+    def is_live(self, max_age=STREAM_STALE_AFTER):
+        return self._thread is not None and time.time() - self._last_message <= max_age
+
+    def latest_price(self):
+        return self._price
+
+    def candles(self, limit=None):
+        with self._lock:
+            window = self._candles if limit is None else self._candles[-limit:]
+            return window.copy()
+
+    # --- lifecycle ---------------------------------------------------------
+
+    def start(self):
+        if websocket is None:
+            raise RuntimeError("Streaming mode needs the websocket-client package")
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"stream-{self.symbol}-{self.interval}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        delay = 1
+        while not self._stop.is_set():
+            try:
+                # Connect first so messages that arrive during the backfill queue up in the socket
+                self._ws = websocket.create_connection(self.url, timeout=STREAM_STALE_AFTER * 2)
+                self._backfill()
+                delay = 1
+                while not self._stop.is_set():
+                    self._handle(self._ws.recv())
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                print(f"[stream] {self.symbol} {self.interval} disconnected: {e}")
+            finally:
+                if self._ws is not None:
+                    try:
+                        self._ws.close()
+                    except Exception:
+                        pass
+                    self._ws = None
+            if self._stop.wait(delay):
+                break
+            self.reconnects += 1
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    def _backfill(self):
+        from .btc_data import sync_candles  # imported here: btc_data reads from this module
+        window = sync_candles(self.symbol, self.interval, self.history)
+        with self._lock:
+            self._candles = window[-self.history:]
+            if len(window) and self._price is None:
+                self._price = float(window["close"][-1])
+
+    # --- messages ----------------------------------------------------------
+
+    def _handle(self, raw):
+        if not raw:
+            return
+        msg = json.loads(raw)
+        data = msg.get("data", msg)
+        event = data.get("e")
+        if event == "aggTrade":
+            self._price = float(data["p"])
+        elif event == "kline":
+            self._apply_kline(data["k"])
+        self._last_message = time.time()
+
+    def _apply_kline(self, k):
+        record = np.array([(int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]),
+                            float(k["c"]), float(k["v"]), int(k["T"]))], dtype=CANDLE_DTYPE)
+        with self._lock:
+            if len(self._candles) and self._candles["open_time"][-1] == record["open_time"][0]:
+                self._candles[-1] = record[0]
+            elif not len(self._candles) or record["open_time"][0] > self._candles["open_time"][-1]:
+                self._candles = np.concatenate([self._candles[-(self.history - 1):], record])
+            if self._price is None:
+                self._price = float(k["c"])
+        if k.get("x"):
+            self.store.upsert(record)
+
+
+_streams = {}
+_streams_lock = threading.Lock()
+
+
+def start_stream(symbol="BTCUSDT", interval="1h", **kwargs):
+    key = (symbol.upper(), interval)
+    with _streams_lock:
+        stream = _streams.get(key)
+        if stream is None:
+            stream = _streams[key] = MarketStream(symbol, interval, **kwargs)
+    return stream.start()
+
+
+def stop_streams():
+    with _streams_lock:
+        streams = list(_streams.values())
+        _streams.clear()
+    for stream in streams:
+        stream.stop()
+
+
+def get_stream(symbol="BTCUSDT", interval=None):
+    # Live stream for the symbol (and interval, when given), or None
+    symbol = symbol.upper()
+    for (sym, ivl), stream in list(_streams.items()):
+        if sym == symbol and (interval is None or ivl == interval) and stream.is_live():
+            return stream
+    return None
+
+
+def streaming_enabled():
+    return os.environ.get("BTC_STREAM", "").lower() in ("1", "true", "yes")
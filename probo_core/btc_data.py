@@ -0,0 +1,152 @@
+# btc_data.py
+
+import time
+import numpy as np
+from . import metrics
+from .binance_client import get_client
+from .binance_stream import get_stream
+from .candle_store import CandleStore
+from .candles import Candles, parse_klines
+from .indicators import IndicatorEngine
+
+KLINES_MAX_LIMIT = 1000  # Binance caps a single klines request at 1000 candles
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000, "3d": 259_200_000,
+    "1w": 604_800_000,
+}
+
+def fetch_klines(symbol="BTCUSDT", interval="1h", limit=100, start_time=None):
+    # CANDLE_DTYPE records, decoded straight from the response body
+    return parse_klines(get_client().klines(symbol, interval, limit=limit, start_time=start_time, raw=True))
+
+def candles_to_frame(records):
+    return Candles.from_records(records).to_frame()
+
+def sync_candles(symbol="BTCUSDT", interval="1h", limit=100):
+    # Bring the local store up to date for the latest `limit` candles and return them.
+    # Warm calls only ask Binance for candles newer than what is stored, and skip
+    # HTTP entirely while the newest stored candle is still open.
+    limit = min(limit, KLINES_MAX_LIMIT)
+    step = INTERVAL_MS[interval]
+    store = CandleStore(symbol, interval)
+    window = store.read(limit)
+    now_ms = int(time.time() * 1000)
+
+    if len(window) == limit and now_ms <= window["close_time"][-1]:
+        metrics.inc("candle_sync_total", mode="fresh")
+        return window
+
+    if len(window) == limit:
+        # Re-fetch the last stored candle too: it may have been stored while still forming
+        last_open = int(window["open_time"][-1])
+        missing = (now_ms - last_open) // step + 1
+        if missing <= KLINES_MAX_LIMIT:
+            metrics.inc("candle_sync_total", mode="incremental")
+            store.upsert(fetch_klines(symbol, interval, limit=int(missing), start_time=last_open))
+            return store.read(limit)
+
+    # Cold store, not enough history, a hole in our store inside the window (read() stops
+    # there) or offline longer than one page: take the whole window. A gap that comes back
+    # inside the page is Binance's own and no longer stops read().
+    metrics.inc("candle_sync_total", mode="full")
+    store.upsert(fetch_klines(symbol, interval, limit=limit))
+    return store.read(limit)
+
+def fetch_candles(symbol="BTCUSDT", interval="1h", limit=100, dtype=np.float64):
+    with metrics.span("fetch_candles", interval=interval):
+        return _fetch_candles(symbol, interval, limit, dtype)
+
+def _fetch_candles(symbol, interval, limit, dtype):
+    stream = get_stream(symbol, interval)
+    if stream is not None:
+        window = stream.candles(limit)
+        if len(window) >= min(limit, stream.history):
+            return Candles.from_records(window, dtype)
+    if interval not in INTERVAL_MS:
+        # Calendar intervals (e.g. "1M") have no fixed width, so they bypass the store
+        return Candles.from_records(fetch_klines(symbol, interval, limit), dtype)
+    return Candles.from_records(sync_candles(symbol, interval, limit), dtype)
+
+def fetch_ohlcv(symbol="BTCUSDT", interval="1h", limit=100):
+    return fetch_candles(symbol, interval, limit).to_frame()
+
+# Engine state per window start, so a rerun over the same window (plus any newly
+# arrived candles) only feeds the new rows and the possibly revised last one.
+_INDICATOR_CACHE_SIZE = 8
+_indicator_cache = {}
+
+def indicator_columns(open_times, closes):
+    # {RSI, EMA_20, EMA_50: np.ndarray} for a window; `open_times` keys the engine cache
+    with metrics.span("indicators"):
+        return _indicator_columns(open_times, closes)
+
+def _indicator_columns(open_times, closes):
+    closes = np.asarray(closes, dtype=float)
+    n = len(closes)
+    columns = {c: np.full(n, np.nan) for c in ("RSI", "EMA_20", "EMA_50")}
+    engine, start = IndicatorEngine(), 0
+
+    if n:
+        key = int(open_times[0])
+        cached = _indicator_cache.get(key)
+        if cached is not None:
+            k = len(cached["closes"])
+            if 0 < k < n and open_times[k - 1] == cached["last_ts"] and np.array_equal(closes[:k], cached["closes"]):
+                engine = IndicatorEngine.from_snapshot(cached["engine"])
+                start = k
+                for c in columns:
+                    columns[c][:k] = cached["values"][c]
+        metrics.inc("indicator_cache_total", result="hit" if start else "miss")
+        metrics.inc("indicator_rows_total", n - start)  # rows actually fed to the engine
+
+        for i in range(start, n):
+            values = engine.append(closes[i])
+            for c in columns:
+                columns[c][i] = values[c]
+
+        # Cache everything but the last row, which may still be forming
+        if n > 1:
+            _indicator_cache.pop(key, None)
+            if len(_indicator_cache) >= _INDICATOR_CACHE_SIZE:
+                _indicator_cache.pop(next(iter(_indicator_cache)))
+            snap = engine.snapshot()
+            snap["state"] = snap["base"]
+            snap["base"] = None
+            _indicator_cache[key] = {
+                "closes": closes[:-1].copy(),
+                "last_ts": int(open_times[n - 2]),
+                "engine": snap,
+                "values": {c: v[:-1].copy() for c, v in columns.items()},
+            }
+    return columns
+
+def add_candle_indicators(candles):
+    return candles.with_columns(**indicator_columns(candles.open_time, candles.close))
+
+def add_technical_indicators(df):
+    import pandas as pd
+    # Candle times key the engine cache; any other index falls back to row positions
+    # (the cache still checks the closes, so it can't hand back another frame's values)
+    if isinstance(df.index, pd.DatetimeIndex):
+        open_times = df.index.as_unit("ms").asi8
+    else:
+        open_times = np.arange(len(df), dtype=np.int64)
+    columns = indicator_columns(open_times, df["close"].to_numpy(dtype=float))
+    for c, v in columns.items():
+        df[c] = v
+    return df
+
+def get_current_price(symbol="BTCUSDT"):
+    stream = get_stream(symbol)
+    if stream is not None and stream.latest_price() is not None:
+        return stream.latest_price()
+    return get_client().ticker_price(symbol)
+
+if __name__ == "__main__":
+    df = fetch_ohlcv()
+    df = add_technical_indicators(df)
+    print(df.tail())
+    print(f"Current BTC Price: ${get_current_price()}")
@@ -0,0 +1,141 @@
+# candle_store.py
+
+import os
+import threading
+
+import numpy as np
+
+from .record_file import RecordFile
+
+CANDLE_STORE_DIR = os.environ.get(
+    "BTC_CANDLE_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".candles"),
+)
+
+# One fixed-width record per kline. A store file is a flat array of these
+# sorted by open_time, so any window is a single seek + read (or a memmap).
+CANDLE_DTYPE = np.dtype([
+    ("open_time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+    ("close_time", "<i8"),
+])
+
+# store path -> open_times that follow a hole in Binance's own data. Any gap inside
+# one upserted batch (a klines page, a backfill run) came back that way from the
+# exchange, so refetching cannot fill it; every other gap is a hole in our store.
+_exchange_gaps = {}
+_exchange_gaps_lock = threading.Lock()
+
+
+def klines_to_records(klines):
+    # Binance kline rows: [open_time, open, high, low, close, volume, close_time, ...]
+    return np.array(
+        [(int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]), int(k[6])) for k in klines],
+        dtype=CANDLE_DTYPE,
+    )
+
+
+def gap_starts(records):
+    # open_time of every candle that does not follow the previous one's close_time
+    open_times = records["open_time"]
+    return open_times[1:][open_times[1:] != records["close_time"][:-1] + 1]
+
+
+def merge_records(old, new):
+    # Union by open_time; rows from `new` win so a revised (still-forming) candle replaces the stored one
+    if len(old) == 0:
+        return np.sort(new, order="open_time")
+    combined = np.concatenate([new, old])
+    _, first = np.unique(combined["open_time"], return_index=True)
+    return combined[first]
+
+
+class CandleStore(RecordFile):
+    """Append-mostly on-disk kline store for one (symbol, interval) pair."""
+
+    dtype = CANDLE_DTYPE
+
+    def __init__(self, symbol, interval, root=None):
+        root = root or CANDLE_STORE_DIR
+        self.symbol = symbol.upper()
+        self.interval = interval
+        super().__init__(os.path.join(root, f"{self.symbol}_{interval}.bin"))
+
+    def read(self, limit=None):
+        # Latest `limit` candles (all of them when limit is None), oldest first. With a
+        # limit the window stops at the newest hole in our own store (gaps Binance itself
+        # has don't count), so a short result tells the caller to fetch.
+        with self._locked(exclusive=False):
+            count = self._count()
+            if count == 0:
+                return np.empty(0, dtype=CANDLE_DTYPE)
+            n = count if limit is None else min(limit, count)
+            window = np.fromfile(self.path, dtype=CANDLE_DTYPE, count=n, offset=(count - n) * CANDLE_DTYPE.itemsize)
+        if limit is not None:
+            starts = gap_starts(window)
+            holes = starts[~np.isin(starts, self.exchange_gaps())] if len(starts) else starts
+            if len(holes):
+                window = window[int(np.searchsorted(window["open_time"], holes[-1])):]
+        return window
+
+    def exchange_gaps(self):
+        # Sorted open_times that follow a gap Binance itself has (seen inside a fetched batch)
+        with _exchange_gaps_lock:
+            return np.array(sorted(_exchange_gaps.get(self.path, ())), dtype=np.int64)
+
+    def read_range(self, start_ms, end_ms):
+        # Candles with start_ms <= open_time < end_ms
+        with self._locked(exclusive=False):
+            if self._count() == 0:
+                return np.empty(0, dtype=CANDLE_DTYPE)
+            data = np.memmap(self.path, dtype=CANDLE_DTYPE, mode="r")
+            lo, hi = np.searchsorted(data["open_time"], [start_ms, end_ms])
+            return np.array(data[lo:hi])
+
+    def last(self):
+        tail = self.read(1)
+        return tail[0] if len(tail) else None
+
+    def upsert(self, records):
+        if len(records) == 0:
+            return
+        records = np.sort(np.asarray(records, dtype=CANDLE_DTYPE), order="open_time")
+        missing = gap_starts(records)
+        if len(missing):
+            with _exchange_gaps_lock:
+                _exchange_gaps.setdefault(self.path, set()).update(missing.tolist())
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if not os.path.exists(self.path):
+            open(self.path, "ab").close()
+
+        with self._locked(exclusive=True):
+            count = self._count()
+            if count:
+                open_times = np.memmap(self.path, dtype=CANDLE_DTYPE, mode="r")["open_time"]
+                idx = int(np.searchsorted(open_times, records["open_time"][0]))
+                del open_times
+            else:
+                idx = 0
+
+            # Only the stored tail from the first new open_time onwards is rewritten;
+            # the common case (new candles + the revised last one) touches one or two records.
+            if idx < count:
+                tail = np.fromfile(self.path, dtype=CANDLE_DTYPE, count=count - idx,
+                                   offset=idx * CANDLE_DTYPE.itemsize)
+                records = merge_records(tail, records)
+
+            with open(self.path, "r+b") as fh:
+                fh.truncate(idx * CANDLE_DTYPE.itemsize)
+                fh.seek(0, os.SEEK_END)
+                fh.write(records.tobytes())
+
+    def clear(self):
+        with _exchange_gaps_lock:
+            _exchange_gaps.pop(self.path, None)
+        with self._locked(exclusive=True):
+            if os.path.exists(self.path):
+                os.remove(self.path)
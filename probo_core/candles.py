@@ -0,0 +1,112 @@
+# candles.py
+
+import numpy as np
+
+from .candle_store import CANDLE_DTYPE, klines_to_records
+
+KLINE_FIELDS = 12  # Binance kline row width; only the first 7 are decoded
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def parse_klines(raw):
+    """Decode a raw /klines response body straight into CANDLE_DTYPE records.
+
+    Skips the JSON object model: brackets and quotes are stripped in one
+    pass, the body is split on commas and only the seven fields we keep are
+    converted, column by column. Already-decoded lists are also accepted.
+    """
+    if not isinstance(raw, (bytes, bytearray, memoryview)):
+        return klines_to_records(raw)
+    fields = bytes(raw).translate(None, b'[]" \n').split(b",")
+    if len(fields) < KLINE_FIELDS:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    if len(fields) % KLINE_FIELDS:
+        raise ValueError(f"Malformed klines payload: {len(fields)} fields is not a multiple of {KLINE_FIELDS}")
+    records = np.empty(len(fields) // KLINE_FIELDS, dtype=CANDLE_DTYPE)
+    for i, name in enumerate(CANDLE_DTYPE.names):
+        # ms timestamps are < 2**53, so going through float64 is exact
+        records[name] = np.array(fields[i::KLINE_FIELDS], dtype=np.float64)
+    return records
+
+
+class Candles:
+    """Column-oriented OHLCV arrays: int64 ms timestamps plus float64 (or float32) prices.
+
+    Indicator columns (RSI, EMA_20, ...) ride along in `columns` and are
+    indexed like the price fields, e.g. `candles["close"]`, `candles["RSI"]`.
+    `to_frame()` builds a DataFrame view for plotting on demand and caches it,
+    so treat both the arrays and the frame as read-only once shared.
+    """
+
+    def __init__(self, open_time, open, high, low, close, volume, close_time=None, columns=None, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.open_time = np.ascontiguousarray(open_time, dtype=np.int64)
+        self.open = np.ascontiguousarray(open, dtype=self.dtype)
+        self.high = np.ascontiguousarray(high, dtype=self.dtype)
+        self.low = np.ascontiguousarray(low, dtype=self.dtype)
+        self.close = np.ascontiguousarray(close, dtype=self.dtype)
+        self.volume = np.ascontiguousarray(volume, dtype=self.dtype)
+        self.close_time = None if close_time is None else np.ascontiguousarray(close_time, dtype=np.int64)
+        self.columns = dict(columns or {})
+        self._frame = None
+
+    @classmethod
+    def from_records(cls, records, dtype=np.float64):
+        return cls(records["open_time"], *(records[f] for f in PRICE_FIELDS), close_time=records["close_time"], dtype=dtype)
+
+    @classmethod
+    def from_klines(cls, raw, dtype=np.float64):
+        return cls.from_records(parse_klines(raw), dtype=dtype)
+
+    @classmethod
+    def from_frame(cls, df, dtype=np.float64):
+        index = df.index.as_unit("ms").asi8
+        columns = {c: df[c].to_numpy(dtype=float) for c in df.columns if c not in PRICE_FIELDS}
+        return cls(index, *(df[f].to_numpy() for f in PRICE_FIELDS), columns=columns, dtype=dtype)
+
+    def __len__(self):
+        return len(self.open_time)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key in self.columns:
+                return self.columns[key]
+            if key in PRICE_FIELDS or key in ("open_time", "close_time"):
+                return getattr(self, key)
+            raise KeyError(key)
+        return Candles(
+            self.open_time[key], self.open[key], self.high[key], self.low[key], self.close[key], self.volume[key],
+            close_time=None if self.close_time is None else self.close_time[key],
+            columns={c: v[key] for c, v in self.columns.items()},
+            dtype=self.dtype,
+        )
+
+    def __contains__(self, key):
+        return key in self.columns or key in PRICE_FIELDS
+
+    def tail(self, n):
+        return self[-n:] if n else self[:0]
+
+    def with_columns(self, **columns):
+        # Same price arrays (no copy) with extra / replaced indicator columns
+        return Candles(self.open_time, self.open, self.high, self.low, self.close, self.volume,
+                       close_time=self.close_time, columns={**self.columns, **columns}, dtype=self.dtype)
+
+    def to_records(self):
+        records = np.empty(len(self), dtype=CANDLE_DTYPE)
+        records["open_time"] = self.open_time
+        for f in PRICE_FIELDS:
+            records[f] = getattr(self, f)
+        records["close_time"] = self.close_time if self.close_time is not None else -1
+        return records
+
+    def to_frame(self):
+        if self._frame is None:
+            import pandas as pd
+            df = pd.DataFrame({f: getattr(self, f) for f in PRICE_FIELDS},
+                              index=pd.to_datetime(self.open_time, unit="ms"))
+            df.index.name = "timestamp"
+            for c, v in self.columns.items():
+                df[c] = v
+            self._frame = df
+        return self._frame
@@ -0,0 +1,86 @@
+# data_gather.py
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+from .btc_data import fetch_candles, add_candle_indicators, get_current_price
+from .candles import Candles
+from .candle_store import CandleStore
+from .resample import DERIVED_INTERVALS, fetch_timeframe, resampling_enabled, stored_timeframe
+from .sentiment import get_bitcoin_sentiment, sentiment_refresh_id
+
+# Per-source deadlines in seconds. A source that misses its deadline is reported
+# in `missing` and replaced by its fallback instead of holding up the others.
+DEFAULT_DEADLINES = {
+    "candles": 8.0,
+    "price": 4.0,
+    "sentiment": 6.0,
+}
+NEUTRAL_SENTIMENT = 0
+
+# Our own pool rather than asyncio.to_thread: asyncio.run() joins the default
+# executor on exit, which would make us wait for a source we already gave up on.
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="gather")
+
+
+async def _timed(name, fn, deadline, timings):
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(_executor, fn), deadline)
+    finally:
+        timings[name] = time.perf_counter() - start
+
+
+async def gather_market_data(symbol="BTCUSDT", interval="1h", limit=100, deadlines=None):
+    deadlines = {**DEFAULT_DEADLINES, **(deadlines or {})}
+    derived = resampling_enabled() and interval in DERIVED_INTERVALS
+    if derived:
+        # Derived locally from the shared 1m base series (indicators included)
+        candles = lambda: fetch_timeframe(interval, limit, symbol)
+    else:
+        candles = lambda: add_candle_indicators(fetch_candles(symbol=symbol, interval=interval, limit=limit))
+    sources = {
+        "candles": candles,
+        "price": lambda: get_current_price(symbol),
+        "sentiment": get_bitcoin_sentiment,
+    }
+    timings = {}
+    names = list(sources)
+    outcomes = await asyncio.gather(
+        *(_timed(name, sources[name], deadlines[name], timings) for name in names),
+        return_exceptions=True,
+    )
+
+    results, missing = {}, []
+    for name, outcome in zip(names, outcomes):
+        metrics.observe("gather_source", timings.get(name, 0.0), error=isinstance(outcome, BaseException), source=name)
+        if isinstance(outcome, BaseException):
+            missing.append(name)
+            metrics.inc("gather_fallbacks_total", source=name)
+            print(f"[gather] {name} unavailable: {type(outcome).__name__}: {outcome}")
+        else:
+            results[name] = outcome
+
+    # Fallbacks: last stored (or stored-and-resampled) candles, last close as price, neutral sentiment
+    if "candles" not in results:
+        stored = stored_timeframe(interval, limit, symbol) if derived else CandleStore(symbol, interval).read(limit)
+        if not len(stored):
+            raise RuntimeError("No candle data available from Binance or the local store")
+        results["candles"] = add_candle_indicators(Candles.from_records(stored))
+    if "price" not in results:
+        results["price"] = float(results["candles"].close[-1])
+    if "sentiment" not in results:
+        results["sentiment"] = NEUTRAL_SENTIMENT
+    results["sentiment_id"] = None if "sentiment" in missing else sentiment_refresh_id()
+
+    results["missing"] = tuple(missing)
+    results["timings"] = timings
+    return results
+
+
+def gather(symbol="BTCUSDT", interval="1h", limit=100, deadlines=None):
+    # Blocking entry point for Streamlit / scheduler code
+    return asyncio.run(gather_market_data(symbol, interval, limit, deadlines))
@@ -0,0 +1,146 @@
+# indicators.py
+
+import math
+import numpy as np
+
+RSI_WINDOW = 14
+EMA_WINDOWS = (20, 50)
+
+
+class IndicatorEngine:
+    """Incremental EMA / Wilder-RSI state, O(1) per candle.
+
+    Mirrors ta's EMAIndicator and RSIIndicator (ewm with adjust=False and
+    min_periods=window), so values match the pandas implementation to float
+    tolerance. `append` adds a new candle; `revise` replaces the close of the
+    last candle, which is how a still-forming candle is updated tick by tick.
+    """
+
+    def __init__(self, rsi_window=RSI_WINDOW, ema_windows=EMA_WINDOWS):
+        self.rsi_window = rsi_window
+        self.ema_windows = tuple(ema_windows)
+        self._state = {
+            "count": 0,
+            "last_close": None,
+            "avg_gain": 0.0,
+            "avg_loss": 0.0,
+            "ema": {w: None for w in self.ema_windows},
+        }
+        self._base = None  # state before the last appended candle
+
+    @staticmethod
+    def _copy(state):
+        copied = dict(state)
+        copied["ema"] = dict(state["ema"])
+        return copied
+
+    def _apply(self, close):
+        s = self._state
+        close = float(close)
+        if s["count"] == 0:
+            # ta's first diff is NaN, which its where() turns into a 0 gain / 0 loss
+            for w in self.ema_windows:
+                s["ema"][w] = close
+        else:
+            diff = close - s["last_close"]
+            a = 1.0 / self.rsi_window
+            s["avg_gain"] += a * ((diff if diff > 0 else 0.0) - s["avg_gain"])
+            s["avg_loss"] += a * ((-diff if diff < 0 else 0.0) - s["avg_loss"])
+            for w in self.ema_windows:
+                k = 2.0 / (w + 1)
+                s["ema"][w] += k * (close - s["ema"][w])
+        s["count"] += 1
+        s["last_close"] = close
+        return self.values()
+
+    def append(self, close):
+        self._base = self._copy(self._state)
+        return self._apply(close)
+
+    def revise(self, close):
+        if self._base is None:
+            return self.append(close)
+        self._state = self._copy(self._base)
+        return self._apply(close)
+
+    def update(self, close, new_candle=True):
+        return self.append(close) if new_candle else self.revise(close)
+
+    @property
+    def count(self):
+        return self._state["count"]
+
+    def rsi(self):
+        s = self._state
+        if s["count"] < self.rsi_window:
+            return math.nan
+        if s["avg_loss"] == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + s["avg_gain"] / s["avg_loss"])
+
+    def ema(self, window):
+        s = self._state
+        if s["count"] < window:
+            return math.nan
+        return s["ema"][window]
+
+    def values(self):
+        out = {"RSI": self.rsi()}
+        for w in self.ema_windows:
+            out[f"EMA_{w}"] = self.ema(w)
+        return out
+
+    def snapshot(self):
+        # Plain dict (JSON-serialisable once the int EMA keys are stringified by the caller)
+        return {
+            "rsi_window": self.rsi_window,
+            "ema_windows": list(self.ema_windows),
+            "state": self._copy(self._state),
+            "base": self._copy(self._base) if self._base is not None else None,
+        }
+
+    @classmethod
+    def from_snapshot(cls, snap):
+        engine = cls(snap["rsi_window"], snap["ema_windows"])
+        engine.restore(snap)
+        return engine
+
+    def restore(self, snap):
+        def _load(state):
+            state = self._copy(state)
+            state["ema"] = {int(w): v for w, v in state["ema"].items()}
+            return state
+
+        self._state = _load(snap["state"])
+        self._base = _load(snap["base"]) if snap.get("base") is not None else None
+
+
+def compute_indicators(closes, engine=None, rsi_window=RSI_WINDOW, ema_windows=EMA_WINDOWS):
+    # Feed a batch of closes through an engine; returns {column: np.ndarray}
+    engine = engine or IndicatorEngine(rsi_window, ema_windows)
+    columns = ["RSI"] + [f"EMA_{w}" for w in engine.ema_windows]
+    out = {c: np.empty(len(closes)) for c in columns}
+    for i, close in enumerate(closes):
+        values = engine.append(close)
+        for c in columns:
+            out[c][i] = values[c]
+    return out
+
+
+def ema_series(closes, window):
+    # Whole-series EMA in one vectorized pass (same values as the engine / ta)
+    import pandas as pd
+    return pd.Series(closes, dtype=float).ewm(span=window, min_periods=window, adjust=False).mean().to_numpy()
+
+
+def rsi_series(closes, window=RSI_WINDOW):
+    # Whole-series Wilder RSI in one vectorized pass (same values as the engine / ta)
+    import pandas as pd
+    diff = pd.Series(closes, dtype=float).diff()
+    gain = diff.where(diff > 0, 0.0).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    loss = (-diff.where(diff < 0, 0.0)).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    gain, loss = gain.to_numpy(), loss.to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+    rsi[np.isnan(loss)] = np.nan
+    return rsi
@@ -0,0 +1,228 @@
+# market_daemon.py
+
+import argparse
+import itertools
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+import uuid
+
+from .binance_stream import start_stream, streaming_enabled
+from .candles import Candles
+from .market_snapshot import MarketSnapshot, build_local_snapshot
+
+DEFAULT_SOCKET = "/tmp/btc_market.sock"
+REFRESH_SECONDS = 15       # how often published snapshots are rebuilt
+IDLE_SECONDS = 600         # stop refreshing a (symbol, interval, limit) nobody asked for in this long
+CLIENT_TIMEOUT = 15.0      # first request for a new key waits for a full gather
+
+
+def daemon_socket():
+    # Readers only go through the daemon when BTC_MARKET_SOCKET is set
+    return os.environ.get("BTC_MARKET_SOCKET") or None
+
+
+# --- wire format -----------------------------------------------------------
+# One JSON line each way. Request: {"symbol", "interval", "limit", "epoch", "since"}.
+# Reply: {"epoch": e, "seq": n, "snapshot": {...}}, or {"epoch": e, "seq": n}
+# alone when (epoch, since) is already the latest, or {"error": "..."}. `epoch`
+# is new for every daemon process, so a client never matches a seq from a
+# daemon that has since restarted.
+
+def snapshot_to_dict(snapshot):
+    c = snapshot.candles
+    return {
+        "symbol": snapshot.symbol,
+        "interval": snapshot.interval,
+        "price": snapshot.price,
+        "sentiment": snapshot.sentiment,
+        "created_at": snapshot.created_at,
+        "missing": list(snapshot.missing),
+        "sentiment_id": snapshot.sentiment_id,
+        "candles": {
+            "open_time": c.open_time.tolist(),
+            "close_time": c.close_time.tolist() if c.close_time is not None else None,
+            **{f: getattr(c, f).tolist() for f in ("open", "high", "low", "close", "volume")},
+            "columns": {name: values.tolist() for name, values in c.columns.items()},
+        },
+    }
+
+
+def snapshot_from_dict(data):
+    c = data["candles"]
+    candles = Candles(c["open_time"], c["open"], c["high"], c["low"], c["close"], c["volume"],
+                      close_time=c["close_time"], columns=c["columns"])
+    return MarketSnapshot(
+        symbol=data["symbol"],
+        interval=data["interval"],
+        candles=candles,
+        price=data["price"],
+        sentiment=data["sentiment"],
+        created_at=data["created_at"],
+        missing=tuple(data["missing"]),
+        sentiment_id=data.get("sentiment_id"),
+    )
+
+
+# --- server ----------------------------------------------------------------
+
+class _Published:
+    def __init__(self):
+        self.seq = None
+        self.version = None
+        self.payload = None          # encoded once per version, shared by every reader
+        self.last_requested = time.time()
+        self.lock = threading.Lock()  # one upstream build per key at a time
+
+
+class MarketDaemon:
+    """Owns all upstream fetching and publishes versioned snapshots over a Unix socket.
+
+    Every (symbol, interval, limit) a reader asks for is rebuilt every
+    `refresh` seconds while it keeps being asked for, so upstream traffic
+    depends on the number of distinct keys, not on the number of readers.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, refresh=REFRESH_SECONDS, idle=IDLE_SECONDS):
+        self.socket_path = socket_path
+        self.refresh = refresh
+        self.idle = idle
+        self.epoch = uuid.uuid4().hex
+        self._seq = itertools.count(1)  # daemon-wide, so a key dropped as idle and re-added never reuses a seq
+        self._published = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server = None
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self._published.get(key)
+            if entry is None:
+                entry = self._published[key] = _Published()
+            entry.last_requested = time.time()
+            return entry
+
+    def _rebuild(self, key, entry, only_if_missing=False):
+        with entry.lock:
+            if only_if_missing and entry.payload is not None:
+                return  # another reader's request already built it
+            snapshot = build_local_snapshot(*key)
+            if snapshot.version != entry.version:
+                entry.version = snapshot.version
+                entry.payload = snapshot_to_dict(snapshot)
+                entry.seq = next(self._seq)
+
+    def lookup(self, symbol, interval, limit):
+        key = (symbol.upper(), interval, int(limit))
+        entry = self._entry(key)
+        if entry.payload is None:
+            self._rebuild(key, entry, only_if_missing=True)
+        return entry
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh):
+            now = time.time()
+            with self._lock:
+                for key in [k for k, e in self._published.items() if now - e.last_requested > self.idle]:
+                    del self._published[key]
+                items = list(self._published.items())
+            for key, entry in items:
+                try:
+                    self._rebuild(key, entry)
+                except Exception as e:
+                    print(f"[daemon] refresh of {key} failed: {type(e).__name__}: {e}")
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line)
+                        entry = daemon.lookup(request.get("symbol", "BTCUSDT"), request.get("interval", "1h"),
+                                              request.get("limit", 100))
+                        reply = {"epoch": daemon.epoch, "seq": entry.seq}
+                        if (request.get("epoch"), request.get("since")) != (daemon.epoch, entry.seq):
+                            reply["snapshot"] = entry.payload
+                    except Exception as e:
+                        reply = {"error": f"{type(e).__name__}: {e}"}
+                    self.wfile.write(json.dumps(reply).encode() + b"\n")
+                    self.wfile.flush()
+
+        class Server(socketserver.ThreadingUnixStreamServer):
+            daemon_threads = True
+            request_queue_size = 128  # Unix sockets refuse (EAGAIN) rather than queue past the backlog
+
+        self._server = Server(self.socket_path, Handler)
+        threading.Thread(target=self._refresh_loop, daemon=True).start()
+        print(f"[daemon] serving market snapshots on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+
+
+# --- client ----------------------------------------------------------------
+
+_cache = {}  # key -> ((epoch, seq), MarketSnapshot), so unchanged snapshots are not re-sent or re-decoded
+_cache_lock = threading.Lock()
+
+
+def request_snapshot(symbol="BTCUSDT", interval="1h", limit=100, socket_path=None, timeout=CLIENT_TIMEOUT):
+    """Latest snapshot from the daemon, or None if it cannot be reached."""
+    socket_path = socket_path or daemon_socket()
+    if not socket_path:
+        return None
+    key = (symbol.upper(), interval, int(limit))
+    with _cache_lock:
+        (epoch, seq), cached = _cache.get(key, ((None, None), None))
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            request = {"symbol": symbol, "interval": interval, "limit": limit, "epoch": epoch, "since": seq}
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                reply = json.loads(f.readline())
+    except (OSError, ValueError) as e:
+        print(f"[daemon] unavailable ({type(e).__name__}: {e}), fetching directly")
+        return None
+    if "error" in reply:
+        print(f"[daemon] {reply['error']}, fetching directly")
+        return None
+    version = (reply.get("epoch"), reply.get("seq"))
+    if "snapshot" not in reply:
+        return cached if cached is not None and version == (epoch, seq) else None
+    snapshot = snapshot_from_dict(reply["snapshot"])
+    with _cache_lock:
+        _cache[key] = (version, snapshot)
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve market snapshots to dashboards and the alert bot")
+    parser.add_argument("--socket", default=daemon_socket() or DEFAULT_SOCKET)
+    parser.add_argument("--refresh", type=float, default=REFRESH_SECONDS, help="seconds between rebuilds")
+    parser.add_argument("--idle", type=float, default=IDLE_SECONDS, help="drop keys nobody asked for in this long")
+    args = parser.parse_args()
+
+    if streaming_enabled():
+        start_stream("BTCUSDT", "1h")
+    MarketDaemon(args.socket, args.refresh, args.idle).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
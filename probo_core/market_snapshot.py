@@ -0,0 +1,74 @@
+# market_snapshot.py
+
+import time
+from dataclasses import dataclass, field
+
+from . import metrics
+from .candles import Candles
+from .data_gather import gather
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Everything one tick of analysis needs, fetched once and shared.
+
+    `candles` carries the OHLCV arrays plus RSI / EMA_20 / EMA_50 columns
+    (`candles.to_frame()` for a DataFrame). They are shared by every consumer
+    of the snapshot, so treat them as read-only.
+    """
+
+    symbol: str
+    interval: str
+    candles: Candles
+    price: float
+    sentiment: float
+    created_at: float = field(default_factory=time.time)
+    missing: tuple = ()  # sources that missed their deadline and were replaced by a fallback
+    sentiment_id: int = None  # sentiment refresh the score came from (None for the fallback)
+
+    @property
+    def last_candle_time(self):
+        return int(self.candles.open_time[-1]) if len(self.candles) else None
+
+    @property
+    def version(self):
+        # Changes whenever any input to the analysis changes
+        last_close = float(self.candles.close[-1]) if len(self.candles) else None
+        return (self.symbol, self.interval, self.last_candle_time, last_close, self.price, self.sentiment)
+
+    @property
+    def data_version(self):
+        # Market data only (no live price): a new or revised candle, or a new headline batch
+        last_close = float(self.candles.close[-1]) if len(self.candles) else None
+        return (self.symbol, self.interval, self.last_candle_time, last_close, self.sentiment_id, self.sentiment)
+
+    def closes(self, limit=None):
+        closes = self.candles.close
+        return closes if limit is None else closes[-limit:]
+
+
+def build_snapshot(symbol="BTCUSDT", interval="1h", limit=100, deadlines=None):
+    # With BTC_MARKET_SOCKET set, read the market daemon's published snapshot and
+    # only fetch upstream ourselves if the daemon cannot be reached
+    from .market_daemon import daemon_socket, request_snapshot
+    if daemon_socket():
+        snapshot = request_snapshot(symbol, interval, limit)
+        if snapshot is not None:
+            metrics.inc("snapshots_total", source="daemon")
+            return snapshot
+    metrics.inc("snapshots_total", source="local")
+    return build_local_snapshot(symbol, interval, limit, deadlines)
+
+
+def build_local_snapshot(symbol="BTCUSDT", interval="1h", limit=100, deadlines=None):
+    # Klines, ticker and news are fetched concurrently; see data_gather for the deadlines
+    data = gather(symbol, interval, limit, deadlines)
+    return MarketSnapshot(
+        symbol=symbol,
+        interval=interval,
+        candles=data["candles"],
+        price=data["price"],
+        sentiment=data["sentiment"],
+        missing=data["missing"],
+        sentiment_id=data["sentiment_id"],
+    )
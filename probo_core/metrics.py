@@ -0,0 +1,211 @@
+# metrics.py
+
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# On by default; BTC_METRICS=0 turns every call below into an early return
+# (span() hands back one shared no-op context), so instrumented code costs a
+# global lookup and nothing else.
+METRICS_ENABLED = os.environ.get("BTC_METRICS", "1").lower() not in ("0", "false", "no")
+PREFIX = "probo_"
+SPAN_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+
+_NOOP = nullcontext()
+_lock = threading.Lock()
+_spans = {}       # (name, labels) -> _SpanStats
+_counters = {}    # (name, labels) -> value
+_gauges = {}      # (name, labels) -> value
+_collectors = []  # called at scrape time for values other modules already keep
+
+
+class _SpanStats:
+    __slots__ = ("counts", "count", "sum", "max", "last", "errors")
+
+    def __init__(self):
+        self.counts = [0] * len(SPAN_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, error):
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+        self.errors += error
+        self.counts[bisect.bisect_left(SPAN_BUCKETS, seconds)] += 1  # made cumulative when rendered
+
+
+class _Span:
+    __slots__ = ("key", "start")
+
+    def __init__(self, key):
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _observe(self.key, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+def _key(name, labels):
+    if not labels:
+        return name, ()
+    if len(labels) == 1:
+        (k, v), = labels.items()
+        return name, ((k, str(v)),)
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _observe(key, seconds, error):
+    with _lock:
+        stats = _spans.get(key)
+        if stats is None:
+            stats = _spans[key] = _SpanStats()
+        stats.observe(seconds, error)
+
+
+def enabled():
+    return METRICS_ENABLED
+
+
+def span(name, **labels):
+    """`with span("binance_http", path=...):` times the block (errors counted separately)."""
+    if not METRICS_ENABLED:
+        return _NOOP
+    return _Span(_key(name, labels))
+
+
+def observe(name, seconds, error=False, **labels):
+    # A duration measured elsewhere (e.g. data_gather's per-source timings)
+    if METRICS_ENABLED:
+        _observe(_key(name, labels), seconds, error)
+
+
+def inc(name, value=1, **labels):
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    if METRICS_ENABLED:
+        with _lock:
+            _gauges[_key(name, labels)] = value
+
+
+def register_collector(fn):
+    """`fn()` yields ("counter" | "gauge", name, value, labels) when metrics are read.
+
+    For numbers a module keeps anyway (cache hit counts, Binance weight), so
+    the hot path does no extra bookkeeping for them.
+    """
+    if METRICS_ENABLED:
+        _collectors.append(fn)
+    return fn
+
+
+def _collected():
+    samples = []
+    for fn in list(_collectors):
+        try:
+            samples.extend(fn())
+        except Exception as e:  # a broken collector must not take the endpoint down
+            print(f"[metrics] collector {getattr(fn, '__name__', fn)} failed: {e}")
+    return samples
+
+
+def span_summary():
+    # Rows for the dashboard's timing panel, slowest mean first
+    with _lock:
+        rows = [{
+            "span": name,
+            "labels": ", ".join(f"{k}={v}" for k, v in labels),
+            "count": s.count,
+            "errors": s.errors,
+            "last_ms": s.last * 1000,
+            "mean_ms": s.sum / s.count * 1000 if s.count else 0.0,
+            "max_ms": s.max * 1000,
+        } for (name, labels), s in _spans.items()]
+    return sorted(rows, key=lambda r: r["mean_ms"], reverse=True)
+
+
+def values():
+    # Counters and gauges (collected ones included) as {(name, labels): value}
+    with _lock:
+        result = {**_counters, **_gauges}
+    for kind, name, value, labels in _collected():
+        result[_key(name, labels)] = value
+    return result
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _gauges.clear()
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _series(name, labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return PREFIX + name
+    return PREFIX + name + "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def render_prometheus():
+    """Everything recorded so far in the Prometheus text exposition format (0.0.4)."""
+    with _lock:
+        spans = {k: (list(s.counts), s.count, s.sum, s.errors) for k, s in _spans.items()}
+        families = {}
+        for kind, store in (("counter", _counters), ("gauge", _gauges)):
+            for (name, labels), value in store.items():
+                families.setdefault(name, (kind, []))[1].append((labels, value))
+    for kind, name, value, labels in _collected():
+        families.setdefault(name, (kind, []))[1].append((_key(name, labels)[1], value))
+
+    lines = []
+    if spans:
+        lines += [f"# HELP {PREFIX}span_duration_seconds Wall time of instrumented calls",
+                  f"# TYPE {PREFIX}span_duration_seconds histogram"]
+        for (name, labels), (counts, count, total, _) in sorted(spans.items()):
+            series = (("span", name),) + labels
+            cumulative = 0
+            for le, n in zip(SPAN_BUCKETS, counts):
+                cumulative += n
+                lines.append(f"{_series('span_duration_seconds_bucket', series, [('le', _number(le))])} {cumulative}")
+            lines.append(f"{_series('span_duration_seconds_sum', series)} {_number(total)}")
+            lines.append(f"{_series('span_duration_seconds_count', series)} {count}")
+        lines += [f"# HELP {PREFIX}span_errors_total Instrumented calls that raised",
+                  f"# TYPE {PREFIX}span_errors_total counter"]
+        for (name, labels), (_, _, _, errors) in sorted(spans.items()):
+            lines.append(f"{_series('span_errors_total', (('span', name),) + labels)} {errors}")
+
+    for name in sorted(families):
+        kind, samples = families[name]
+        lines.append(f"# TYPE {PREFIX}{name} {kind}")
+        for labels, value in sorted(samples, key=lambda s: s[0]):
+            lines.append(f"{_series(name, labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
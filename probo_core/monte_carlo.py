@@ -0,0 +1,78 @@
+# monte_carlo.py
+
+import numpy as np
+
+DEFAULT_PATHS = 100_000
+CONFIDENCE_Z = 1.96  # 95% intervals
+# Target on one CPU core for DEFAULT_PATHS paths over a 12-expiry x 41-strike grid
+# (see bench_monte_carlo.py)
+LATENCY_BUDGET_MS = 250
+
+
+def estimate_drift_volatility(closes, interval_hours=1.0):
+    # Per-hour mean and standard deviation of log returns
+    log_returns = np.diff(np.log(np.asarray(closes, dtype=float)))
+    log_returns = log_returns[np.isfinite(log_returns)]
+    if len(log_returns) < 2:
+        return 0.0, 0.0
+    mu = log_returns.mean() / interval_hours
+    sigma = log_returns.std(ddof=1) / np.sqrt(interval_hours)
+    return float(mu), float(sigma)
+
+
+def simulate_terminal_log_returns(hours, mu, sigma, n_paths=DEFAULT_PATHS, seed=None, antithetic=True):
+    """Simulated log(S_t / S_0) at each horizon, shape (n_paths, len(hours)).
+
+    Paths are built by cumulating independent Gaussian increments between the
+    sorted horizons, so every expiry on a path is consistent with the others.
+    """
+    hours = np.asarray(hours, dtype=float)
+    order = np.argsort(hours)
+    dt = np.diff(np.concatenate([[0.0], hours[order]]))
+    rng = np.random.default_rng(seed)
+
+    half = (n_paths + 1) // 2 if antithetic else n_paths
+    z = rng.standard_normal((half, len(hours)), dtype=np.float32)
+    if antithetic:
+        z = np.concatenate([z, -z])[:n_paths]
+
+    steps = z * np.float32(sigma) * np.sqrt(dt, dtype=np.float32) + np.float32(mu) * dt.astype(np.float32)
+    paths = np.cumsum(steps, axis=1)
+    out = np.empty_like(paths)
+    out[:, order] = paths
+    return out
+
+
+def hit_probabilities(price, strikes, hours, mu, sigma, n_paths=DEFAULT_PATHS, seed=None):
+    """P(price at expiry >= strike) for every (expiry, strike) pair.
+
+    Returns a table with one row per pair (strikes varying fastest) holding the
+    probability, its 95% Wilson interval and the simulated median price.
+    """
+    strikes = np.asarray(strikes, dtype=float).ravel()
+    hours = np.atleast_1d(np.asarray(hours, dtype=float))
+    log_returns = simulate_terminal_log_returns(hours, mu, sigma, n_paths=n_paths, seed=seed)
+
+    # Sort each expiry's outcomes once; every strike is then a binary search
+    log_returns.sort(axis=0)
+    thresholds = np.log(strikes / price).astype(np.float32)
+    n = log_returns.shape[0]
+    hits = np.empty((len(hours), len(strikes)))
+    for e in range(len(hours)):
+        hits[e] = n - np.searchsorted(log_returns[:, e], thresholds, side="left")
+    median = price * np.exp(np.median(log_returns, axis=0).astype(float))
+
+    p = hits / n
+    z2 = CONFIDENCE_Z ** 2
+    center = (p + z2 / (2 * n)) / (1 + z2 / n)
+    half_width = CONFIDENCE_Z * np.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+
+    import pandas as pd
+    return pd.DataFrame({
+        "hours_remaining": np.repeat(hours, len(strikes)),
+        "target_price": np.tile(strikes, len(hours)),
+        "probability": p.ravel(),
+        "ci_low": np.clip(center - half_width, 0, 1).ravel(),
+        "ci_high": np.clip(center + half_width, 0, 1).ravel(),
+        "median_price": np.repeat(np.round(median, 2), len(strikes)),
+    })
@@ -0,0 +1,138 @@
+# prediction_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+from . import metrics
+from .advisor import score_advice
+from .predictor import recommend_probo_vote_for_target, recommend_probo_votes_for_grid
+from .probo_strategy import interpret_market_conditions
+
+MAX_ENTRIES = 256
+SNAPSHOT_MAX_AGE = 60  # seconds a pinned snapshot (and so its live price) keeps being reused
+
+
+class PredictionCache:
+    """Bounded LRU memo for results derived from market data.
+
+    Entries are keyed on (name, data version, args). The data version comes
+    from MarketSnapshot.data_version, so a new candle, a revised forming
+    candle or a new headline batch yields new keys; as soon as a (name,
+    symbol, interval) sees a newer version its older entries are dropped.
+    Cached values are shared between callers (and Streamlit sessions), so
+    treat them as read-only.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}  # (name, symbol, interval) -> latest data version seen
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, name, version, args, compute):
+        scope = (name, *version[:2])
+        key = (name, version, args)
+        with self._lock:
+            if self._versions.get(scope) != version:
+                self._versions[scope] = version
+                for stale in [k for k in self._entries if k[0] == name and k[1][:2] == version[:2] and k[1] != version]:
+                    del self._entries[stale]
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()  # outside the lock; two racing misses just compute twice
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / total if total else 0.0}
+
+
+_cache = PredictionCache()
+
+
+def get_cache():
+    return _cache
+
+
+@metrics.register_collector
+def _collect_cache():
+    stats = _cache.stats()
+    yield "counter", "cache_hits_total", stats["hits"], {"cache": "prediction"}
+    yield "counter", "cache_misses_total", stats["misses"], {"cache": "prediction"}
+    yield "gauge", "cache_entries", stats["entries"], {"cache": "prediction"}
+    yield "gauge", "cache_hit_ratio", stats["hit_rate"], {"cache": "prediction"}
+
+
+_pinned = {}  # (symbol, interval) -> snapshot the current data version was first seen in
+_pinned_lock = threading.Lock()
+
+
+def pin_snapshot(snapshot, max_age=SNAPSHOT_MAX_AGE):
+    """The snapshot already seen for this data version, if it is recent enough.
+
+    Every rerun builds a new snapshot with a freshly fetched ticker price, and
+    the vote / grid results depend on that price, so keying on it alone would
+    almost never hit. Reusing one snapshot per data version (for at most
+    `max_age` seconds) keeps reruns on the same keys until the market data changes.
+    """
+    scope = snapshot.data_version[:2]
+    with _pinned_lock:
+        pinned = _pinned.get(scope)
+        if (pinned is not None and pinned.data_version == snapshot.data_version
+                and snapshot.created_at - pinned.created_at < max_age):
+            return pinned
+        _pinned[scope] = snapshot
+        return snapshot
+
+
+def _minute(now=None):
+    # Results that depend on "hours remaining" also expire when the clock minute changes
+    return int((time.time() if now is None else now) // 60)
+
+
+def market_conditions(snapshot):
+    return _cache.get_or_compute("market", snapshot.data_version, (), lambda: interpret_market_conditions(snapshot))
+
+
+def vote_for_target(target_price, target_time_str, snapshot, mode="linear"):
+    args = (float(target_price), target_time_str, mode, snapshot.price, _minute())
+    return _cache.get_or_compute("vote", snapshot.data_version, args, lambda: recommend_probo_vote_for_target(
+        target_price, target_time_str, snapshot=snapshot, mode=mode))
+
+
+def votes_for_grid(target_prices, target_time_strs, snapshot, mode="linear"):
+    args = (tuple(float(p) for p in target_prices), tuple(target_time_strs), mode, snapshot.price, _minute())
+    return _cache.get_or_compute("grid", snapshot.data_version, args, lambda: recommend_probo_votes_for_grid(
+        target_prices, target_time_strs, snapshot=snapshot, mode=mode))
+
+
+def advice(snapshot, hours_remaining):
+    market = market_conditions(snapshot)
+    # Hours only matter against the 2h / 3h thresholds, so the minute is fine-grained enough
+    args = (round(hours_remaining, 2), _minute())
+    return _cache.get_or_compute("advice", snapshot.data_version, args, lambda: score_advice(
+        market, float(snapshot.candles.close[-1]), snapshot.sentiment, hours_remaining))
+
+
+def memoize(name, snapshot, args, build):
+    # Anything else derived from the snapshot's data (e.g. a chart figure)
+    return _cache.get_or_compute(name, snapshot.data_version, tuple(args), build)
@@ -0,0 +1,423 @@
+# prediction_ledger.py
+
+import os
+import threading
+import time
+from datetime import timezone
+
+import numpy as np
+
+from . import metrics
+from .advisor import VERDICTS
+from .candle_store import CandleStore
+from .predictor import PROJECTION_MODES, hours_until
+from .probo_strategy import RSI_OVERBOUGHT, RSI_OVERSOLD
+from .record_file import RecordFile
+
+PREDICTION_LEDGER_PATH = os.environ.get(
+    "BTC_PREDICTION_LEDGER",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".predictions.bin"),
+)
+SOURCES = ("app", "alert")
+NO_VERDICT = 255                  # advisor not scored for this row
+TRUST_KEYS = ("near_expiry", "clean_trend", "strong_sentiment", "calm_rsi")   # bit order in `trust`
+CAUTION_KEYS = ("far_expiry", "extreme_rsi", "flat_sentiment")               # ... and in `caution`
+HOURS_EDGES = (0.5, 1, 2, 3, 6, 12)
+HOURS_LABELS = ("<0.5h", "0.5-1h", "1-2h", "2-3h", "3-6h", "6-12h", ">=12h")
+RSI_ZONES = ("oversold", "neutral", "overbought", "unknown")  # unknown: RSI was NaN (too few candles)
+RESOLVE_INTERVAL = "1m"           # realized price = open of the 1m candle starting at the target time
+RESOLVE_DELAY_MS = 5_000          # give the target minute's candle a moment to appear
+RESOLVE_EVERY = 60                # seconds between background resolver passes
+KLINES_PAGE = 1000
+
+# One fixed-width record per prediction, appended in creation order. Only the
+# outcome fields (realized_price, resolved_ms) are ever written again, in place.
+LEDGER_DTYPE = np.dtype([
+    ("created_ms", "<i8"),
+    ("target_ms", "<i8"),
+    ("resolved_ms", "<i8"),       # 0 until resolved
+    ("current_price", "<f8"),
+    ("target_price", "<f8"),
+    ("projected_price", "<f8"),
+    ("realized_price", "<f8"),    # NaN until resolved
+    ("avg_delta", "<f4"),
+    ("hours_remaining", "<f4"),
+    ("sentiment", "<f4"),
+    ("rsi", "<f4"),
+    ("probability", "<f4"),       # NaN in linear mode
+    ("vote", "u1"),               # 1 = YES
+    ("mode", "u1"),               # index into PROJECTION_MODES
+    ("source", "u1"),             # index into SOURCES
+    ("verdict", "u1"),            # index into advisor.VERDICTS, or NO_VERDICT
+    ("trust", "u1"),              # TRUST_KEYS bitmask
+    ("caution", "u1"),            # CAUTION_KEYS bitmask
+])
+
+PENDING, MISS, HIT = 0, 1, 2   # per-row outcome code in the column cache
+OUTCOMES = 3
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+GROUPS = {
+    "hours": HOURS_LABELS,
+    "rsi_zone": RSI_ZONES,
+    "verdict": VERDICTS + ("none",),
+    "trust": tuple(str(i) for i in range(len(TRUST_KEYS) + 1)),
+    "caution": tuple(str(i) for i in range(len(CAUTION_KEYS) + 1)),
+    "vote": ("NO", "YES"),
+    "mode": PROJECTION_MODES,
+    "source": SOURCES,
+}
+
+
+_CACHE_COLUMNS = [("created_ms", np.int64), ("target_ms", np.int64), ("outcome", np.uint8),
+                  ("abs_error", np.float64)] + [(f"by_{by}", np.uint8) for by in GROUPS]
+
+
+def _group_codes(by, rows):
+    # Small-integer group code per row; computed once when rows enter the column cache
+    if by == "hours":
+        return np.digitize(rows["hours_remaining"], HOURS_EDGES).astype(np.uint8)
+    if by == "rsi_zone":
+        rsi = rows["rsi"]
+        codes = np.select([np.isnan(rsi), rsi < RSI_OVERSOLD, rsi > RSI_OVERBOUGHT], [3, 0, 2], default=1)
+        return codes.astype(np.uint8)
+    if by == "verdict":
+        return np.minimum(rows["verdict"], len(VERDICTS)).astype(np.uint8)
+    if by in ("trust", "caution"):
+        return _POPCOUNT[rows[by]]
+    return rows[by].astype(np.uint8)
+
+
+def _bits(flags, keys):
+    return sum(1 << i for i, key in enumerate(keys) if flags.get(key))
+
+
+class PredictionLedger(RecordFile):
+    """Append-only on-disk log of vote recommendations and their outcomes.
+
+    Aggregate queries run on an in-memory column cache holding each row's group
+    codes and outcome (pending / miss / hit). A query reads only the rows
+    appended since the last one, plus rows that were still unresolved, then
+    groups with a single np.bincount, so it stays cheap at millions of rows.
+    """
+
+    dtype = LEDGER_DTYPE
+
+    def __init__(self, path=None):
+        super().__init__(path or PREDICTION_LEDGER_PATH)
+        self._cache_lock = threading.Lock()
+        self._columns = None     # name -> buffer; the first _n entries are valid
+        self._n = 0
+        self._pending_from = 0   # first cached row without an outcome
+
+    def read(self, start=0, stop=None):
+        with self._locked(exclusive=False):
+            count = self._count()
+            stop = count if stop is None else min(stop, count)
+            if stop <= start:
+                return np.empty(0, dtype=LEDGER_DTYPE)
+            return np.fromfile(self.path, dtype=LEDGER_DTYPE, count=stop - start, offset=start * LEDGER_DTYPE.itemsize)
+
+    def append(self, records):
+        records = np.array(records, dtype=LEDGER_DTYPE)
+        if len(records) == 0:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if not os.path.exists(self.path):
+            open(self.path, "ab").close()
+        with self._locked(exclusive=True):
+            count = self._count()
+            if count:
+                # Keep created_ms non-decreasing so time filters can binary search
+                last = np.fromfile(self.path, dtype=LEDGER_DTYPE, count=1, offset=(count - 1) * LEDGER_DTYPE.itemsize)
+                records["created_ms"] = np.maximum(records["created_ms"], last["created_ms"][0])
+            with open(self.path, "ab") as fh:
+                fh.write(records.tobytes())
+
+    def due(self, now_ms):
+        # (indices, target_ms) of unresolved rows whose target time has passed
+        with self._cache_lock:
+            self._sync()
+            start, n = self._pending_from, self._n
+            targets = self._columns["target_ms"][start:n]
+            due = np.flatnonzero((self._columns["outcome"][start:n] == PENDING) & (targets <= now_ms))
+            return start + due, targets[due]
+
+    def resolve(self, indices, realized, resolved_ms=None):
+        # Fill in outcomes in place; the prediction fields of a row are never rewritten
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) == 0:
+            return
+        resolved_ms = int(time.time() * 1000) if resolved_ms is None else resolved_ms
+        price_at = LEDGER_DTYPE.fields["realized_price"][1]
+        resolved_at = LEDGER_DTYPE.fields["resolved_ms"][1]
+        stamp = np.int64(resolved_ms).tobytes()
+        with self._locked(exclusive=True):
+            with open(self.path, "r+b") as fh:
+                for i, price in zip(indices.tolist(), np.broadcast_to(np.asarray(realized, dtype="<f8"), indices.shape).tolist()):
+                    row = i * LEDGER_DTYPE.itemsize
+                    fh.seek(row + price_at)
+                    fh.write(np.float64(price).tobytes())
+                    fh.seek(row + resolved_at)
+                    fh.write(stamp)
+        metrics.inc("ledger_resolved_total", len(indices))
+
+    # --- queries -----------------------------------------------------------
+
+    def _reserve(self, n):
+        # Grow the column buffers (doubling) so appends don't copy every column each time
+        capacity = len(self._columns["created_ms"]) if self._columns is not None else 0
+        if self._columns is not None and n <= capacity:
+            return
+        capacity = max(n, 2 * capacity, 1024)
+        columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in _CACHE_COLUMNS}
+        if self._columns is not None:
+            for name, values in self._columns.items():
+                columns[name][:self._n] = values[:self._n]
+        self._columns = columns
+
+    def _load(self, start, rows):
+        # Columns, outcome and group codes for `rows`, stored from index `start`
+        end = start + len(rows)
+        cols = self._columns
+        cols["created_ms"][start:end] = rows["created_ms"]
+        cols["target_ms"][start:end] = rows["target_ms"]
+        for by in GROUPS:
+            cols[f"by_{by}"][start:end] = _group_codes(by, rows)
+        self._load_outcomes(start, rows)
+
+    def _load_outcomes(self, start, rows):
+        realized = rows["realized_price"]
+        resolved = ~np.isnan(realized)
+        hit = (realized >= rows["target_price"]) == (rows["vote"] == 1)
+        end = start + len(rows)
+        self._columns["outcome"][start:end] = np.where(resolved, np.where(hit, HIT, MISS), PENDING)
+        self._columns["abs_error"][start:end] = np.where(resolved, np.abs(rows["projected_price"] - realized), 0.0)
+
+    def _sync(self):
+        # Bring the column cache up to date (caller holds _cache_lock)
+        count = self._count()
+        if self._pending_from < self._n:
+            # Outcomes can only have changed for rows that were pending last time
+            self._load_outcomes(self._pending_from, self.read(self._pending_from, self._n))
+        if count > self._n:
+            rows = self.read(self._n, count)
+            self._reserve(self._n + len(rows))
+            self._load(self._n, rows)
+            self._n += len(rows)
+        if self._columns is None:
+            self._reserve(0)
+        unresolved = np.flatnonzero(self._columns["outcome"][self._pending_from:self._n] == PENDING)
+        self._pending_from = self._pending_from + int(unresolved[0]) if len(unresolved) else self._n
+
+    def _window(self, since_ms, until_ms, source, mode):
+        # Cached columns for rows created in [since_ms, until_ms) plus a row mask for the filters (or None)
+        with self._cache_lock:
+            self._sync()
+            n = self._n
+            created = self._columns["created_ms"][:n]
+            lo = 0 if since_ms is None else int(np.searchsorted(created, since_ms, side="left"))
+            hi = n if until_ms is None else int(np.searchsorted(created, until_ms, side="left"))
+            window = {name: values[lo:hi] for name, values in self._columns.items()}
+        mask = None
+        if source is not None:
+            mask = window["by_source"] == SOURCES.index(source)
+        if mode is not None:
+            by_mode = window["by_mode"] == PROJECTION_MODES.index(mode)
+            mask = by_mode if mask is None else mask & by_mode
+        return window, mask
+
+    def hit_rates(self, by="hours", since_ms=None, until_ms=None, source=None, mode=None):
+        """Hit rate of the votes per group; `by` is one of GROUPS.
+
+        A vote hits when the realized price at the target time is on its side of
+        the strike (YES: >= target, NO: below). Unresolved rows count towards
+        `predictions` only.
+        """
+        labels = GROUPS[by]
+        k = len(labels)
+        window, mask = self._window(since_ms, until_ms, source, mode)
+        codes, outcome, error = window[f"by_{by}"], window["outcome"], window["abs_error"]
+        if mask is not None:
+            codes, outcome, error = codes[mask], outcome[mask], error[mask]
+
+        # One pass for (group, outcome) counts, one for the projection error sums
+        counts = np.bincount(codes * OUTCOMES + outcome, minlength=k * OUTCOMES).reshape(k, OUTCOMES)
+        errors = np.bincount(codes, weights=error, minlength=k)
+        rows = []
+        for i, label in enumerate(labels):
+            total, hits = int(counts[i].sum()), int(counts[i, HIT])
+            settled = hits + int(counts[i, MISS])
+            if total:
+                rows.append({
+                    by: label,
+                    "predictions": total,
+                    "resolved": settled,
+                    "hits": hits,
+                    "hit_rate": hits / settled if settled else None,
+                    "mean_abs_error": float(errors[i]) / settled if settled else None,
+                })
+        return rows
+
+    def summary(self, since_ms=None, until_ms=None, source=None, mode=None):
+        window, mask = self._window(since_ms, until_ms, source, mode)
+        outcome = window["outcome"] if mask is None else window["outcome"][mask]
+        pending, misses, hits = (int(c) for c in np.bincount(outcome, minlength=OUTCOMES))
+        settled = hits + misses
+        return {
+            "predictions": settled + pending,
+            "resolved": settled,
+            "pending": pending,
+            "hits": hits,
+            "hit_rate": hits / settled if settled else None,
+        }
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = PredictionLedger()
+        return _ledger
+
+
+def _to_ms(dt):
+    return int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _records(n, snapshot, mode, source, market, advice, now_ms):
+    records = np.zeros(n, dtype=LEDGER_DTYPE)
+    records["created_ms"] = now_ms
+    records["realized_price"] = np.nan
+    records["current_price"] = snapshot.price
+    records["sentiment"] = snapshot.sentiment
+    records["rsi"] = market["rsi"] if market is not None else np.nan
+    records["mode"] = PROJECTION_MODES.index(mode)
+    records["source"] = SOURCES.index(source)
+    if advice is not None:
+        records["verdict"] = VERDICTS.index(advice["verdict"])
+        records["trust"] = _bits(advice["trust"], TRUST_KEYS)
+        records["caution"] = _bits(advice["caution"], CAUTION_KEYS)
+    else:
+        records["verdict"] = NO_VERDICT
+    return records
+
+
+def _scores(snapshot, hours_remaining, market, advice):
+    # Market read and advisor verdict from the (memoized) prediction cache unless given
+    from . import prediction_cache
+    market = market if market is not None else prediction_cache.market_conditions(snapshot)
+    advice = advice if advice is not None else prediction_cache.advice(snapshot, hours_remaining)
+    return market, advice
+
+
+def record_vote(result, snapshot, source="app", mode="linear", market=None, advice=None, ledger=None):
+    # One recommend_probo_vote_for_target() result
+    now = time.time()
+    market, advice = _scores(snapshot, result["hours_remaining"], market, advice)
+    records = _records(1, snapshot, mode, source, market, advice, int(now * 1000))
+    target_time, _ = hours_until(result["target_time"])
+    records["target_ms"] = _to_ms(target_time)
+    records["target_price"] = result["target_price"]
+    records["projected_price"] = result["projected_price"]
+    records["avg_delta"] = result["avg_delta_per_hour"]
+    records["hours_remaining"] = result["hours_remaining"]
+    records["vote"] = result["vote"] == "YES"
+    records["probability"] = result.get("probability", np.nan)
+    (ledger if ledger is not None else get_ledger()).append(records)
+    metrics.inc("ledger_records_total", source=source)
+
+
+def record_grid(table, snapshot, source="alert", mode="linear", market=None, advice=None, ledger=None):
+    # Every row of a recommend_probo_votes_for_grid() table
+    if len(table) == 0:
+        return
+    now = time.time()
+    hours = table["hours_remaining"].to_numpy(dtype=float)
+    market, advice = _scores(snapshot, float(hours[0]), market, advice)
+    records = _records(len(table), snapshot, mode, source, market, advice, int(now * 1000))
+    # The exact expiries the grid was computed for; re-parsing "HH:MM" now could roll a
+    # target that has just been reached over to tomorrow
+    exact = table.attrs.get("target_times", {})
+    targets = {t: _to_ms(exact[t] if t in exact else hours_until(t)[0]) for t in table["target_time"].unique()}
+    records["target_ms"] = table["target_time"].map(targets).to_numpy(dtype=np.int64)
+    records["target_price"] = table["target_price"].to_numpy(dtype=float)
+    records["projected_price"] = table["projected_price"].to_numpy(dtype=float)
+    records["avg_delta"] = table.attrs.get("avg_delta_per_hour", np.nan)
+    records["hours_remaining"] = hours
+    records["vote"] = table["vote"].to_numpy() == "YES"
+    if "probability" in table:
+        records["probability"] = table["probability"].to_numpy(dtype=float)
+    else:
+        records["probability"] = np.nan
+    (ledger if ledger is not None else get_ledger()).append(records)
+    metrics.inc("ledger_records_total", len(records), source=source)
+
+
+# --- outcome resolution ----------------------------------------------------
+
+def resolve_due(ledger=None, symbol="BTCUSDT", now_ms=None):
+    """Fill in the realized price of every prediction whose target time has passed.
+
+    Prices come from the local 1m candle store; target minutes it does not
+    hold yet are fetched into it first (one klines page covers ~16 hours).
+    Returns the number of rows resolved.
+    """
+    from .btc_data import INTERVAL_MS, fetch_klines
+
+    ledger = ledger if ledger is not None else get_ledger()
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    due, targets = ledger.due(now_ms - RESOLVE_DELAY_MS)
+    if len(due) == 0:
+        return 0
+
+    step = INTERVAL_MS[RESOLVE_INTERVAL]
+    targets = targets // step * step
+    store = CandleStore(symbol, RESOLVE_INTERVAL)
+
+    def lookup():
+        candles = store.read_range(int(targets.min()), int(targets.max()) + step)
+        if len(candles) == 0:
+            return candles, np.zeros(len(targets), dtype=np.int64), np.zeros(len(targets), dtype=bool)
+        pos = np.minimum(np.searchsorted(candles["open_time"], targets), len(candles) - 1)
+        return candles, pos, candles["open_time"][pos] == targets
+
+    candles, pos, found = lookup()
+    if not found.all():
+        page_start = None
+        for target in np.unique(targets[~found]):
+            if page_start is None or target >= page_start + KLINES_PAGE * step:
+                page_start = int(target)
+                store.upsert(fetch_klines(symbol, RESOLVE_INTERVAL, limit=KLINES_PAGE, start_time=page_start))
+        candles, pos, found = lookup()
+
+    ledger.resolve(due[found], candles["open"][pos[found]], now_ms)
+    return int(found.sum())
+
+
+_resolver = None
+
+
+def start_resolver(every=RESOLVE_EVERY, symbol="BTCUSDT"):
+    # One background thread per process; returns it (already running) on repeat calls
+    global _resolver
+    with _ledger_lock:
+        if _resolver is not None:
+            return _resolver
+
+        def loop():
+            while True:
+                try:
+                    with metrics.span("ledger_resolve"):
+                        resolve_due(symbol=symbol)
+                except Exception as e:
+                    print(f"[ledger] resolve failed: {type(e).__name__}: {e}")
+                time.sleep(every)
+
+        _resolver = threading.Thread(target=loop, name="ledger-resolver", daemon=True)
+        _resolver.start()
+        return _resolver
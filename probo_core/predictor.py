@@ -0,0 +1,169 @@
+# predictor.py
+
+from . import metrics
+from .btc_data import fetch_candles, get_current_price, INTERVAL_MS
+from .monte_carlo import estimate_drift_volatility, hit_probabilities
+from .sentiment import get_bitcoin_sentiment
+from .market_snapshot import build_snapshot
+import datetime
+import numpy as np
+
+PROJECTION_LOOKBACK = 10  # hourly candles used for the average delta
+MIN_HOURS_REMAINING = 0.25  # Minimum 15 min window
+YES_MIN_SENTIMENT = -0.1
+VOLATILITY_LOOKBACK = 100  # candles used to estimate drift/volatility in monte_carlo mode
+YES_MIN_PROBABILITY = 0.5
+PROJECTION_MODES = ("linear", "monte_carlo")
+
+def hours_until(target_time_str, now=None):
+    # "HH:MM" (UTC) -> (next datetime at that time, hours remaining)
+    now = now or datetime.datetime.utcnow()
+    target_time = datetime.datetime.strptime(target_time_str, "%H:%M")
+    target_time = now.replace(hour=target_time.hour, minute=target_time.minute, second=0, microsecond=0)
+
+    if target_time < now:
+        target_time += datetime.timedelta(days=1)
+
+    hours_remaining = (target_time - now).total_seconds() / 3600
+    return target_time, max(MIN_HOURS_REMAINING, round(hours_remaining, 2))
+
+def expiry(target, now=None):
+    # (target datetime, hours remaining) for an "HH:MM" (UTC) string, or for a datetime
+    # (naive = UTC) that is used as is, e.g. the exact block boundary the scheduler passes
+    if not isinstance(target, datetime.datetime):
+        return hours_until(target, now)
+    now = now or datetime.datetime.utcnow()
+    if target.tzinfo is not None:
+        target = target.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    hours_remaining = (target - now).total_seconds() / 3600
+    return target, max(MIN_HOURS_REMAINING, round(hours_remaining, 2))
+
+def decide_vote(projected, target_price, sentiment, min_sentiment=YES_MIN_SENTIMENT):
+    # Works on scalars and on broadcastable NumPy arrays
+    return np.where((np.asarray(projected) >= target_price) & (np.asarray(sentiment) >= min_sentiment), "YES", "NO")
+
+def decide_vote_by_probability(probability, sentiment):
+    return np.where((np.asarray(probability) >= YES_MIN_PROBABILITY) & (np.asarray(sentiment) >= YES_MIN_SENTIMENT), "YES", "NO")
+
+def simulate_outcomes(snapshot, strikes, hours):
+    # Monte Carlo P(price >= strike) from drift/volatility of the snapshot's candles
+    interval_hours = INTERVAL_MS.get(snapshot.interval, 3_600_000) / 3_600_000
+    mu, sigma = estimate_drift_volatility(snapshot.closes(VOLATILITY_LOOKBACK), interval_hours)
+    return hit_probabilities(snapshot.price, strikes, hours, mu, sigma)
+
+def predict_future_price(hours_ahead=1, snapshot=None):
+    if snapshot is not None:
+        # Reuse candles and price already in hand instead of refetching
+        closes = snapshot.closes(PROJECTION_LOOKBACK)
+        current_price = snapshot.price
+    else:
+        closes = fetch_candles(interval="1h", limit=PROJECTION_LOOKBACK).close
+        current_price = get_current_price()
+
+    # Calculate avg price movement per hour
+    avg_delta = float(np.diff(closes).mean())
+
+    projected_price = current_price + (avg_delta * hours_ahead)
+
+    return round(projected_price, 2), round(avg_delta, 2), current_price
+
+def recommend_probo_vote_for_target(target_price, target_time_str, snapshot=None, mode="linear"):
+    with metrics.span("predict", mode=mode):
+        return _recommend_vote(target_price, target_time_str, snapshot, mode)
+
+def _recommend_vote(target_price, target_time_str, snapshot, mode):
+    if mode not in PROJECTION_MODES:
+        raise ValueError(f"Unknown projection mode: {mode!r}")
+    if mode == "monte_carlo" and snapshot is None:
+        snapshot = build_snapshot(limit=VOLATILITY_LOOKBACK)
+
+    # 1. Parse time and calculate hours remaining
+    target_time, hours_remaining = hours_until(target_time_str)
+
+    # 2. Get sentiment
+    sentiment = snapshot.sentiment if snapshot is not None else get_bitcoin_sentiment()
+
+    # 3. Predict price
+    projected, delta, current = predict_future_price(hours_remaining, snapshot=snapshot)
+
+    # 4. Decision logic
+    if mode == "monte_carlo":
+        outcome = simulate_outcomes(snapshot, [target_price], [hours_remaining]).iloc[0]
+        projected = outcome["median_price"]
+        vote = str(decide_vote_by_probability(outcome["probability"], sentiment))
+    else:
+        vote = str(decide_vote(projected, target_price, sentiment))
+
+    # 5. Return analysis
+    result = {
+        "current_price": current,
+        "avg_delta_per_hour": delta,
+        "hours_remaining": hours_remaining,
+        "projected_price": projected,
+        "sentiment": sentiment,
+        "target_price": target_price,
+        "target_time": target_time.strftime("%H:%M"),
+        "vote": vote
+    }
+    if mode == "monte_carlo":
+        result["probability"] = round(float(outcome["probability"]), 4)
+        result["probability_ci"] = (round(float(outcome["ci_low"]), 4), round(float(outcome["ci_high"]), 4))
+
+    return result
+
+def recommend_probo_votes_for_grid(target_prices, target_time_strs, snapshot=None, mode="linear"):
+    # Same rule as recommend_probo_vote_for_target for every (strike, expiry) pair,
+    # from a single data fetch. Returns one row per pair, strikes varying fastest.
+    with metrics.span("predict_grid", mode=mode):
+        return _recommend_grid(target_prices, target_time_strs, snapshot, mode)
+
+def _recommend_grid(target_prices, target_time_strs, snapshot, mode):
+    if mode not in PROJECTION_MODES:
+        raise ValueError(f"Unknown projection mode: {mode!r}")
+    if snapshot is None:
+        snapshot = build_snapshot(limit=VOLATILITY_LOOKBACK if mode == "monte_carlo" else PROJECTION_LOOKBACK)
+
+    strikes = np.asarray(target_prices, dtype=float).ravel()
+    now = datetime.datetime.utcnow()
+    targets = [target_time_strs] if isinstance(target_time_strs, (str, datetime.datetime)) else target_time_strs
+    expiries = [expiry(t, now) for t in targets]
+    hours = np.array([h for _, h in expiries])
+
+    avg_delta = float(np.diff(snapshot.closes(PROJECTION_LOOKBACK)).mean())
+    projected = np.round(snapshot.price + avg_delta * hours, 2)          # (E,)
+    votes = decide_vote(projected[:, None], strikes[None, :], snapshot.sentiment)  # (E, S)
+
+    import pandas as pd
+    table = pd.DataFrame({
+        "target_time": np.repeat([t.strftime("%H:%M") for t, _ in expiries], len(strikes)),
+        "hours_remaining": np.repeat(hours, len(strikes)),
+        "target_price": np.tile(strikes, len(hours)),
+        "projected_price": np.repeat(projected, len(strikes)),
+        "vote": votes.ravel(),
+    })
+    if mode == "monte_carlo":
+        outcomes = simulate_outcomes(snapshot, strikes, hours)
+        table["projected_price"] = outcomes["median_price"].to_numpy()
+        for column in ("probability", "ci_low", "ci_high"):
+            table[column] = outcomes[column].to_numpy()
+        table["vote"] = decide_vote_by_probability(table["probability"].to_numpy(), snapshot.sentiment)
+    table.attrs.update({
+        "current_price": snapshot.price,
+        "avg_delta_per_hour": round(avg_delta, 2),
+        "sentiment": snapshot.sentiment,
+        "target_times": {t.strftime("%H:%M"): t for t, _ in expiries},  # exact expiry per target_time label
+    })
+    return table
+
+def strike_ladder(center, step=250, count=4):
+    # `count` strikes either side of `center`, snapped to multiples of `step`
+    base = round(center / step) * step
+    return [base + i * step for i in range(-count, count + 1)]
+
+if __name__ == "__main__":
+    # Sample example:
+    question = recommend_probo_vote_for_target(target_price=63500, target_time_str="23:00")
+    
+    print("\n🧠 Prediction Summary:")
+    for k, v in question.items():
+        print(f"{k.replace('_', ' ').title()}: {v}")
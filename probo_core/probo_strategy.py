@@ -0,0 +1,61 @@
+# probo_strategy.py
+
+import numpy as np
+from .market_snapshot import build_snapshot
+
+RSI_OVERSOLD = 30
+RSI_OVERBOUGHT = 70
+BULLISH_MIN_SENTIMENT = 0      # bullish trend needs sentiment above this
+OVERSOLD_MIN_SENTIMENT = -0.1  # oversold bounce needs sentiment above this
+
+def decide_market_vote(bullish_trend, oversold, overbought, sentiment,
+                       bullish_min_sentiment=BULLISH_MIN_SENTIMENT, oversold_min_sentiment=OVERSOLD_MIN_SENTIMENT):
+    # YES on a bullish trend with positive sentiment, or an oversold market that
+    # sentiment doesn't argue against; NO otherwise (overbought + negative sentiment
+    # is a NO too). Works on scalars and on NumPy arrays.
+    bullish_trend, oversold, sentiment = np.asarray(bullish_trend), np.asarray(oversold), np.asarray(sentiment)
+    yes = (bullish_trend & (sentiment > bullish_min_sentiment)) | (oversold & (sentiment > oversold_min_sentiment))
+    return np.where(yes, "YES", "NO")
+
+def interpret_market_conditions(data, rsi_oversold=RSI_OVERSOLD, rsi_overbought=RSI_OVERBOUGHT):
+    # Accepts indicator Candles, an indicator DataFrame or a MarketSnapshot
+    candles = getattr(data, "candles", data)
+    rsi = float(np.asarray(candles["RSI"])[-1])
+    ema_20 = float(np.asarray(candles["EMA_20"])[-1])
+    ema_50 = float(np.asarray(candles["EMA_50"])[-1])
+
+    # Trend signal
+    bullish_trend = ema_20 > ema_50
+    oversold = rsi < rsi_oversold
+    overbought = rsi > rsi_overbought
+
+    return {
+        "bullish_trend": bullish_trend,
+        "oversold": oversold,
+        "overbought": overbought,
+        "rsi": rsi,
+        "ema_20": ema_20,
+        "ema_50": ema_50
+    }
+
+def recommend_probo_vote(snapshot=None):
+    if snapshot is None:
+        print("[+] Fetching market data and sentiment...")
+        snapshot = build_snapshot()
+    market = interpret_market_conditions(snapshot)
+    price = snapshot.price
+    sentiment_score = snapshot.sentiment
+
+    print("\n📊 BTC Market Snapshot")
+    print(f"Price: ${price}")
+    print(f"RSI: {market['rsi']:.2f} | EMA20: {market['ema_20']:.2f} | EMA50: {market['ema_50']:.2f}")
+    print(f"Sentiment Score: {sentiment_score} ({'Bullish' if sentiment_score > 0 else 'Bearish' if sentiment_score < 0 else 'Neutral'})")
+
+    # Decision logic
+    vote = str(decide_market_vote(market["bullish_trend"], market["oversold"], market["overbought"], sentiment_score))
+
+    print(f"\n🧠 Probo Recommendation: ✅ Vote {vote}")
+    return vote
+
+if __name__ == "__main__":
+    recommend_probo_vote()
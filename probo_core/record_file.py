@@ -0,0 +1,58 @@
+# record_file.py
+#
+# A flat binary file of fixed-width NumPy records, shared by several threads and
+# processes (the app, the alert bot, the daemon). CandleStore and PredictionLedger
+# build on this for their locking and record count.
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def thread_lock(path):
+    # One lock per file path, so every object opened on the same file shares it
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+
+def record_count(path, dtype):
+    try:
+        return os.path.getsize(path) // dtype.itemsize
+    except FileNotFoundError:
+        return 0
+
+
+class RecordFile:
+    dtype = None  # set by subclasses
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = thread_lock(path)
+
+    @contextmanager
+    def _locked(self, exclusive):
+        # Thread lock in this process, flock across processes
+        with self._lock:
+            if fcntl is None or not os.path.exists(self.path):
+                yield
+                return
+            with open(self.path, "rb") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _count(self):
+        return record_count(self.path, self.dtype)
+
+    def __len__(self):
+        return self._count()
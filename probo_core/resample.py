@@ -0,0 +1,218 @@
+# resample.py
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from .btc_data import INTERVAL_MS, KLINES_MAX_LIMIT, sync_candles
+from .candle_store import CANDLE_DTYPE, CandleStore
+from .candles import Candles
+from .indicators import IndicatorEngine
+
+BASE_INTERVAL = "1m"
+DERIVED_INTERVALS = ("5m", "15m", "1h", "4h")
+TIMEFRAME_HISTORY = 500  # bars kept in memory per derived timeframe
+
+
+def aggregate(base, step):
+    # Group base candles into `step`-wide OHLCV bars (base must be sorted by open_time)
+    if len(base) == 0:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    buckets = base["open_time"] // step * step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(base)] - 1
+    bars = np.empty(len(starts), dtype=CANDLE_DTYPE)
+    bars["open_time"] = buckets[starts]
+    bars["open"] = base["open"][starts]
+    bars["high"] = np.maximum.reduceat(base["high"], starts)
+    bars["low"] = np.minimum.reduceat(base["low"], starts)
+    bars["close"] = base["close"][ends]
+    bars["volume"] = np.add.reduceat(base["volume"], starts)
+    bars["close_time"] = bars["open_time"] + step - 1
+    return bars
+
+
+def missing_ranges(open_times, start_ms, step):
+    # [gap_start, gap_end) runs of `step`-spaced candles absent from sorted `open_times`,
+    # counting from start_ms up to the newest stored candle
+    edges = np.concatenate(([start_ms - step], open_times))
+    jumps = np.flatnonzero(np.diff(edges) > step)
+    return [(int(edges[i]) + step, int(edges[i + 1])) for i in jumps]
+
+
+class Timeframe:
+    """Bars and indicators for one derived interval, updated from base candles."""
+
+    def __init__(self, interval, history=TIMEFRAME_HISTORY):
+        self.interval = interval
+        self.step = INTERVAL_MS[interval]
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        self.bars = np.empty(0, dtype=CANDLE_DTYPE)
+        self.engine = IndicatorEngine()
+        self.states = []  # engine snapshot taken before each bar, so any bar can be recomputed
+        self.columns = ["RSI"] + [f"EMA_{w}" for w in self.engine.ema_windows]
+        self.indicators = np.empty((0, len(self.columns)))
+
+    def update(self, base):
+        # `base` holds every base candle from the start of the first bucket that changed
+        if len(base) == 0:
+            return
+        affected_from = int(base["open_time"][0]) // self.step * self.step
+        new_bars = aggregate(base[base["open_time"] >= affected_from], self.step)
+        if len(self.bars) and affected_from < self.bars["open_time"][0]:
+            self.reset()  # reaches back past the bars we hold: rebuild from `base`
+        keep = int(np.searchsorted(self.bars["open_time"], affected_from))
+
+        if keep < len(self.bars):
+            # Late or still-forming candles changed bars from `keep` on: resume from the
+            # engine state saved before that bar, so indicators stay on the continuous series
+            self.engine = IndicatorEngine.from_snapshot(self.states[keep])
+        states, rows = self.states[:keep], []
+        for close in new_bars["close"]:
+            states.append(self.engine.snapshot())
+            rows.append(self._values(self.engine.append(close)))
+        self.states = states
+        self.bars = np.concatenate([self.bars[:keep], new_bars])
+        self.indicators = np.concatenate([self.indicators[:keep], np.array(rows).reshape(-1, len(self.columns))])
+
+        if len(self.bars) > self.history:
+            self.bars = self.bars[-self.history:]
+            self.indicators = self.indicators[-self.history:]
+            self.states = self.states[-self.history:]
+
+    def _values(self, values):
+        return [values[c] for c in self.columns]
+
+    def candles(self, limit=None):
+        bars = self.bars if limit is None else self.bars[-limit:]
+        indicators = self.indicators if limit is None else self.indicators[-limit:]
+        return Candles.from_records(bars).with_columns(**{c: indicators[:, i] for i, c in enumerate(self.columns)})
+
+
+class MultiTimeframe:
+    """One 1-minute base series per symbol with 5m/15m/1h/4h bars derived from it.
+
+    Only the base series costs API weight (and only new minutes once warm);
+    every derived timeframe and its indicators are updated locally and
+    incrementally as base candles arrive. A timeframe is built the first time
+    it is asked for, from just enough base candles for the bars requested.
+    """
+
+    def __init__(self, symbol="BTCUSDT", intervals=DERIVED_INTERVALS, history=TIMEFRAME_HISTORY):
+        self.symbol = symbol.upper()
+        self.base_step = INTERVAL_MS[BASE_INTERVAL]
+        self.timeframes = {i: Timeframe(i, history) for i in intervals}
+        self.store = CandleStore(self.symbol, BASE_INTERVAL)
+        self._last_open = None
+        self._tried = set()  # (gap_start, gap_end) base ranges already backfilled once
+        self._lock = threading.Lock()
+
+    def sync(self, interval=None, bars=None):
+        # Bring the base series and every built timeframe up to date, then make sure
+        # `interval` (all of them when None) holds `bars` bars (its full history when None)
+        with self._lock:
+            sync_candles(self.symbol, BASE_INTERVAL, KLINES_MAX_LIMIT)
+            if self._last_open is not None and int(time.time() * 1000) - self._last_open > self._built_span():
+                # Offline for longer than the built histories: rebuild on demand rather than fill it all
+                for tf in self.timeframes.values():
+                    tf.reset()
+                self._last_open = None
+            if self._last_open is not None:
+                self._apply(self._base_from(self._last_open))
+            for name in (self.timeframes if interval is None else (interval,)):
+                self._warm_up(self.timeframes[name], bars)
+
+    def _warm_up(self, tf, bars=None):
+        bars = tf.history if bars is None else min(bars, tf.history)
+        if len(tf.bars) >= bars:
+            return
+        # `bars` closed bars plus the forming one, fetching only the base candles that span needs
+        now_ms = int(time.time() * 1000)
+        start_ms = (now_ms // tf.step - bars) * tf.step
+        stored = self._base_from(start_ms)
+        tf.reset()
+        tf.update(stored)
+        if self._last_open is None and len(stored):
+            # First timeframe built; later timeframes re-read from here on their next update
+            self._last_open = int(stored["open_time"][-1])
+
+    def _base_from(self, start_ms):
+        # Stored base candles from start_ms, fetching any missing minutes first. sync_candles
+        # only takes the newest page after a long pause, and aggregating across the hole
+        # would silently produce short bars.
+        stored = self.store.read_range(start_ms, 2 ** 62)
+        gaps = missing_ranges(stored["open_time"], start_ms, self.base_step)
+        if not len(stored):
+            gaps = [(start_ms, int(time.time() * 1000))]
+        # A gap Binance itself has comes back empty; ask for each range once, not every sync
+        exchange = set(self.store.exchange_gaps().tolist())
+        gaps = [g for g in gaps if g not in self._tried and g[1] not in exchange]
+        if not gaps:
+            return stored
+        self._tried.update(gaps)
+        from .backfill import backfill  # deep history comes in parallel pages
+        for gap_start, gap_end in gaps:
+            backfill(self.symbol, BASE_INTERVAL, start=gap_start, end=gap_end, checkpoint=False, quiet=True)
+        return self.store.read_range(start_ms, 2 ** 62)
+
+    def _built_span(self):
+        # Time covered by the longest built timeframe
+        return max((len(tf.bars) * tf.step for tf in self.timeframes.values()), default=0)
+
+    def _apply(self, base):
+        if len(base) == 0:
+            return
+        for tf in self.timeframes.values():
+            if not len(tf.bars):
+                continue  # not built yet
+            # Re-aggregate from the start of the bucket holding the first changed base candle
+            bucket_start = int(base["open_time"][0]) // tf.step * tf.step
+            if bucket_start < base["open_time"][0]:
+                base_for_tf = self.store.read_range(bucket_start, 2 ** 62)
+            else:
+                base_for_tf = base
+            tf.update(base_for_tf)
+        # The last base candle may still be forming; start there next time
+        self._last_open = int(base["open_time"][-1])
+
+    def candles(self, interval, limit=100):
+        # Under the lock: a concurrent update replaces bars and indicators one after the other
+        with self._lock:
+            return self.timeframes[interval].candles(limit)
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_multi_timeframe(symbol="BTCUSDT"):
+    with _instances_lock:
+        mtf = _instances.get(symbol.upper())
+        if mtf is None:
+            mtf = _instances[symbol.upper()] = MultiTimeframe(symbol)
+        return mtf
+
+
+def fetch_timeframe(interval="1h", limit=100, symbol="BTCUSDT"):
+    # OHLCV + RSI/EMA candles for `interval`, derived from the shared 1m base series
+    mtf = get_multi_timeframe(symbol)
+    mtf.sync(interval, limit)
+    return mtf.candles(interval, limit)
+
+
+def stored_timeframe(interval="1h", limit=100, symbol="BTCUSDT"):
+    # `interval` bars aggregated from whatever 1m candles are stored, without any
+    # network call (data_gather's fallback when the resampled fetch misses its deadline)
+    step = INTERVAL_MS[interval]
+    now_ms = int(time.time() * 1000)
+    base = CandleStore(symbol, BASE_INTERVAL).read_range((now_ms // step - limit + 1) * step, 2 ** 62)
+    return aggregate(base, step)[-limit:]
+
+
+def resampling_enabled():
+    return os.environ.get("BTC_RESAMPLE", "").lower() in ("1", "true", "yes")
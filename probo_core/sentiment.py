@@ -0,0 +1,97 @@
+# sentiment.py (Fixed)
+
+import os
+import urllib.parse
+import threading
+import time
+from . import metrics
+from .sentiment_cache import SentimentCache, HeadlineAggregate
+
+SENTIMENT_TTL = 600  # seconds between Google News refreshes
+# "textblob" (default), or a sentiment_batch mode: "compat" (TextBlob-equivalent, vectorized) / "fast"
+SENTIMENT_SCORER = os.environ.get("BTC_SENTIMENT_SCORER", "textblob")
+# Google News search feed; point it at a local stand-in (see replay.py) to run offline
+NEWS_RSS_URL = os.environ.get("BTC_NEWS_RSS_URL", "https://news.google.com/rss/search")
+NEWS_TIMEOUT = (3.05, 5)  # connect / read seconds; feedparser.parse(url) itself never times out
+
+_cache = SentimentCache(namespace="" if SENTIMENT_SCORER == "textblob" else SENTIMENT_SCORER)
+_aggregates = {}  # query -> HeadlineAggregate
+_latest = {}      # query -> (score, fetched_at)
+_refresh_ids = {} # query -> number of completed refreshes (a new headline batch each time)
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+def score_headlines(headlines):
+    # Only called with cache misses, so this span is the scorer's (TextBlob's) real cost
+    with metrics.span("sentiment_score", scorer=SENTIMENT_SCORER):
+        metrics.inc("sentiment_scored_total", len(headlines), scorer=SENTIMENT_SCORER)
+        return _score(headlines)
+
+def _score(headlines):
+    if SENTIMENT_SCORER != "textblob":
+        from .sentiment_batch import score_batch
+        return score_batch(headlines, mode=SENTIMENT_SCORER).tolist()
+    from textblob import TextBlob  # heavy (nltk); only loaded once headlines need scoring
+    return [TextBlob(headline).sentiment.polarity for headline in headlines]
+
+def fetch_news_sentiment(query="bitcoin", max_items=20):
+    encoded_query = urllib.parse.quote(query)  # URL encode the query
+    url = f"{NEWS_RSS_URL}?q={encoded_query}"
+
+    import feedparser
+    import requests
+    with metrics.span("news_fetch"):
+        try:
+            response = requests.get(url, timeout=NEWS_TIMEOUT, headers={"User-Agent": feedparser.USER_AGENT})
+            response.raise_for_status()
+        except requests.RequestException as e:
+            metrics.inc("news_fetch_failures_total")
+            print(f"[sentiment] news fetch failed: {type(e).__name__}: {e}")
+            return 0  # Neutral, as with no news
+        feed = feedparser.parse(response.content)
+    if feed.get("bozo") and not feed.entries:
+        metrics.inc("news_fetch_failures_total")
+    headlines = [entry.title for entry in feed.entries[:max_items]]
+
+    if not headlines:
+        return 0  # Neutral if no news
+
+    # Only headlines not seen before reach TextBlob; the mean is updated incrementally
+    with _lock:
+        aggregate = _aggregates.setdefault(query, HeadlineAggregate(_cache))
+        return round(aggregate.update(headlines, score_headlines), 3)
+
+def get_bitcoin_sentiment(query="bitcoin OR btc"):
+    # Process-wide TTL memo (works the same under Streamlit, Flask or plain scripts)
+    cached = _latest.get(query)
+    if cached is not None and time.time() - cached[1] < SENTIMENT_TTL:
+        return cached[0]
+    # Only one refresh at a time. Everyone else gets the stale score rather than
+    # parking a (shared data_gather pool) thread behind a slow feed.
+    if not _refresh_lock.acquire(blocking=False):
+        if cached is not None:
+            return cached[0]
+        raise TimeoutError("news sentiment refresh already in progress")
+    try:
+        # Another caller may have refreshed it while we waited
+        cached = _latest.get(query)
+        if cached is not None and time.time() - cached[1] < SENTIMENT_TTL:
+            return cached[0]
+        score = fetch_news_sentiment(query)
+        _latest[query] = (score, time.time())
+        _refresh_ids[query] = _refresh_ids.get(query, 0) + 1
+        return score
+    finally:
+        _refresh_lock.release()
+
+@metrics.register_collector
+def _collect_cache():
+    yield "counter", "cache_hits_total", _cache.hits, {"cache": "sentiment"}
+    yield "counter", "cache_misses_total", _cache.misses, {"cache": "sentiment"}
+    yield "gauge", "cache_entries", len(_cache), {"cache": "sentiment"}
+    total = _cache.hits + _cache.misses
+    yield "gauge", "cache_hit_ratio", _cache.hits / total if total else 0.0, {"cache": "sentiment"}
+
+def sentiment_refresh_id(query="bitcoin OR btc"):
+    # Changes whenever get_bitcoin_sentiment fetched a new headline batch
+    return _refresh_ids.get(query, 0)
@@ -0,0 +1,173 @@
+# sentiment_batch.py
+
+import re
+from itertools import islice
+
+import numpy as np
+
+# Tokens we care about: words/numbers (keeping inner "-", ".", ",") and "!".
+# "\n" separates headlines once a batch is joined into one string.
+_TOKEN_RE = re.compile(r"\n|!|[a-z0-9]+(?:[-.,][a-z0-9]+)*")
+# TextBlob also lists "n't", but its tokenizer splits it apart on string input, so it never fires
+NEGATIONS = ("no", "not", "never")
+MODIFIER_POS = "RB"
+EXCLAMATION_BOOST = 1.25
+NEGATION_FACTOR = -0.5
+
+# Max absolute polarity difference from TextBlob that compat mode promises, checked by
+# bench_sentiment.py on fixtures/headlines.txt (where it currently matches exactly).
+# The margin covers what is not modelled: emoticons, "(!)" sarcasm and punctuation edge cases.
+COMPAT_TOLERANCE = 0.05
+
+
+class Lexicon:
+    """TextBlob's (pattern) en-sentiment lexicon compiled into NumPy arrays."""
+
+    def __init__(self):
+        from textblob.en import sentiment as pattern_lexicon
+
+        if not dict.__len__(pattern_lexicon):
+            pattern_lexicon.load()
+        words = sorted(dict.keys(pattern_lexicon))
+        self.index = {w: i for i, w in enumerate(words)}
+        self.polarity = np.empty(len(words))
+        self.intensity = np.empty(len(words))
+        self.modifier = np.zeros(len(words), dtype=bool)
+        for i, w in enumerate(words):
+            senses = dict.__getitem__(pattern_lexicon, w)
+            # String input is scored without POS tags, i.e. on the all-senses average
+            p, _, intensity = senses[None]
+            self.polarity[i] = p
+            self.intensity[i] = intensity
+            self.modifier[i] = MODIFIER_POS in senses
+        self.negations = set(NEGATIONS)
+
+
+_lexicon = None
+
+
+def get_lexicon():
+    global _lexicon
+    if _lexicon is None:
+        _lexicon = Lexicon()
+    return _lexicon
+
+
+def _tokenize(headlines, lexicon):
+    text = "\n".join(h.replace("\n", " ") for h in headlines).lower()
+    tokens = _TOKEN_RE.findall(text)
+    is_break = np.fromiter((t == "\n" for t in tokens), dtype=bool, count=len(tokens))
+    headline = np.cumsum(is_break)[~is_break]
+    tokens = [t for t in tokens if t != "\n"]
+    index = lexicon.index
+    ids = np.fromiter((index.get(t, -1) for t in tokens), dtype=np.int64, count=len(tokens))
+    lengths = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=len(tokens))
+    negation = np.fromiter((t in lexicon.negations for t in tokens), dtype=bool, count=len(tokens))
+    exclamation = np.fromiter((t == "!" for t in tokens), dtype=bool, count=len(tokens))
+    return headline, ids, lengths, negation, exclamation
+
+
+def _last_before(mask, same_headline_start):
+    # For every position j: index of the last True in mask strictly before j within the
+    # same headline, or -1
+    idx = np.arange(len(mask))
+    last = np.maximum.accumulate(np.where(mask, idx, -1))
+    last = np.concatenate([[-1], last[:-1]])
+    return np.where(last >= same_headline_start, last, -1)
+
+
+def _score_fast(n, headline, ids, lexicon):
+    known = ids >= 0
+    polarity = lexicon.polarity[ids[known]]
+    total = np.bincount(headline[known], weights=polarity, minlength=n)
+    count = np.bincount(headline[known], minlength=n)
+    return np.divide(total, count, out=np.zeros(n), where=count > 0)
+
+
+def _score_compat(n, headline, ids, lengths, negation, exclamation, lexicon):
+    # Vectorized version of pattern's Sentiment.assessments(): a known word preceded by
+    # a modifier ("very good") joins the modifier's assessment with polarity
+    # p * intensity(modifier); a negation within reach flips it to p * -0.5; every "!"
+    # boosts the latest assessment by 1.25. Scores are averaged per assessment.
+    size = len(ids)
+    if size == 0:
+        return np.zeros(n)
+    idx = np.arange(size)
+    start = np.searchsorted(headline, headline)  # first token index of each token's headline
+    known = ids >= 0
+    safe_ids = np.where(known, ids, 0)
+    polarity = np.where(known, lexicon.polarity[safe_ids], 0.0)
+    intensity = np.where(known, lexicon.intensity[safe_ids], 1.0)
+    modifier = known & lexicon.modifier[safe_ids]
+
+    prev_known = _last_before(known, start)
+    prev = np.maximum(prev_known, 0)
+
+    # Negation reaches the next known word across words of at most one letter ("not a good")
+    prev_negation = _last_before(negation, start)
+    prev_long_negation_breaker = _last_before(~known & ~negation & (lengths > 1), start)
+    negated = known & (prev_negation >= 0) & (prev_negation >= prev_known) & (prev_negation > prev_long_negation_breaker)
+
+    # Modifiers carry over short unknown words ("really is a good") and negations
+    # ("really not good"), not other longer words
+    prev_long = _last_before(~known & ~negation & (lengths > 2), start)
+    merged = known & (prev_known >= 0) & modifier[prev] & (prev_long < prev_known)
+
+    # A negated modifier inverts its intensity ("not very good")
+    merge_intensity = np.where(negated, 1.0 / intensity, intensity)[prev]
+    effective = np.where(merged, np.clip(polarity * merge_intensity, -1.0, 1.0), polarity)
+
+    group_start = known & ~merged
+    group = np.cumsum(group_start) - 1
+    n_groups = int(group_start.sum())
+    group_headline = headline[group_start]
+    group_polarity = np.zeros(n_groups)
+    # The last word of a chain decides its polarity
+    known_pos = idx[known]
+    known_group = group[known]
+    chain_end = np.append(known_group[1:] != known_group[:-1], True)
+    group_polarity[known_group[chain_end]] = effective[known_pos[chain_end]]
+
+    group_negated = np.zeros(n_groups, dtype=bool)
+    np.logical_or.at(group_negated, group[negated], True)
+
+    # "!" boosts the latest assessment in the same headline
+    bang = exclamation & (group >= 0)
+    bang_group = group[bang]
+    bang_group = bang_group[group_headline[bang_group] == headline[bang]]
+    boosts = np.bincount(bang_group, minlength=n_groups)
+    group_polarity = np.clip(group_polarity * EXCLAMATION_BOOST ** boosts, -1.0, 1.0)
+
+    group_polarity = np.where(group_negated, group_polarity * NEGATION_FACTOR, group_polarity)
+    total = np.bincount(group_headline, weights=group_polarity, minlength=n)
+    count = np.bincount(group_headline, minlength=n)
+    return np.divide(total, count, out=np.zeros(n), where=count > 0)
+
+
+def score_batch(headlines, mode="compat"):
+    """Polarity in [-1, 1] for each headline, as a NumPy array.
+
+    mode="compat" follows TextBlob's modifier / negation / "!" rules (within
+    COMPAT_TOLERANCE of TextBlob); mode="fast" is the plain lexicon mean.
+    """
+    headlines = list(headlines)
+    n = len(headlines)
+    if n == 0:
+        return np.zeros(0)
+    lexicon = get_lexicon()
+    headline, ids, lengths, negation, exclamation = _tokenize(headlines, lexicon)
+    if mode == "fast":
+        return _score_fast(n, headline, ids, lexicon)
+    if mode == "compat":
+        return _score_compat(n, headline, ids, lengths, negation, exclamation, lexicon)
+    raise ValueError(f"Unknown scoring mode: {mode!r}")
+
+
+def iter_scores(headlines, mode="compat", batch_size=4096):
+    # Stream version: consumes any iterable in batches and yields one score per headline
+    it = iter(headlines)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield from score_batch(batch, mode=mode)
@@ -0,0 +1,144 @@
+# sentiment_cache.py
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+
+SENTIMENT_CACHE_PATH = os.environ.get(
+    "BTC_SENTIMENT_CACHE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".sentiment_cache.json"),
+)
+MAX_ENTRIES = 5000
+ENTRY_TTL = 7 * 24 * 3600  # headlines rarely resurface after a week
+
+
+def headline_key(headline, namespace=""):
+    # Case and whitespace differences don't change the polarity we care about.
+    # The namespace keeps scores from different scorers apart.
+    normalized = " ".join(headline.lower().split())
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}" if namespace else digest
+
+
+class SentimentCache:
+    """Bounded LRU/TTL memo of per-headline polarity, persisted as JSON.
+
+    Framework-independent: works the same in Streamlit, the Flask bot or a script.
+    """
+
+    def __init__(self, path=SENTIMENT_CACHE_PATH, max_entries=MAX_ENTRIES, ttl=ENTRY_TTL, namespace=""):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._scores = OrderedDict()  # key -> (polarity, scored_at)
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[sentiment] ignoring unreadable cache {self.path}: {e}")
+            return
+        now = time.time()
+        for key, (score, scored_at) in entries.items():
+            if now - scored_at < self.ttl:
+                self._scores[key] = (score, scored_at)
+        self._evict()
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            entries = dict(self._scores)
+        # A temp file of our own: the app, the bot and sentiment_batch can all be saving at once
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)),
+                                   prefix=os.path.basename(self.path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _evict(self):
+        while len(self._scores) > self.max_entries:
+            self._scores.popitem(last=False)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def scores(self, headlines, scorer):
+        """Polarity per headline; only cache misses are passed (as one list) to `scorer`."""
+        keys = [headline_key(h, self.namespace) for h in headlines]
+        now = time.time()
+        found, todo = {}, {}
+        with self._lock:
+            for key, headline in zip(keys, headlines):
+                entry = self._scores.get(key)
+                if entry is not None and now - entry[1] < self.ttl:
+                    self._scores.move_to_end(key)
+                    found[key] = entry[0]
+                    self.hits += 1
+                elif key not in todo:
+                    todo[key] = headline
+                    self.misses += 1
+
+        if todo:
+            new_scores = scorer(list(todo.values()))
+            with self._lock:
+                for key, score in zip(todo, new_scores):
+                    score = float(score)
+                    self._scores[key] = (score, now)
+                    found[key] = score
+                self._evict()
+            self.save()
+
+        return [found[key] for key in keys]
+
+
+class HeadlineAggregate:
+    """Running mean over the current headline set.
+
+    Each refresh only adds the scores of headlines that appeared and subtracts
+    those that dropped out, instead of re-averaging the whole feed.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._counts = Counter()
+        self._score_of = {}
+        self._total = 0.0
+
+    def update(self, headlines, scorer):
+        namespace = self.cache.namespace
+        new_counts = Counter(headline_key(h, namespace) for h in headlines)
+        added = [h for h in dict.fromkeys(headlines) if headline_key(h, namespace) not in self._score_of]
+        if added:
+            for h, score in zip(added, self.cache.scores(added, scorer)):
+                self._score_of[headline_key(h, namespace)] = score
+
+        for key in set(self._counts) | set(new_counts):
+            delta = new_counts.get(key, 0) - self._counts.get(key, 0)
+            if delta:
+                self._total += delta * self._score_of[key]
+        for key in set(self._counts) - set(new_counts):
+            del self._score_of[key]
+        self._counts = new_counts
+
+        n = sum(new_counts.values())
+        return self._total / n if n else 0
@@ -0,0 +1,383 @@
+# replay.py
+
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+REPLAY_DIR = os.path.join(FIXTURES_DIR, "replay")
+HEADLINES_PATH = os.path.join(FIXTURES_DIR, "headlines.txt")
+
+NEWS_QUERY = "bitcoin OR btc"
+RSS_PATH = "/rss/search"
+KLINES_PAGE = 1000            # Binance caps a klines page at 1000 rows
+DEFAULT_KLINES_LIMIT = 500    # ... and returns 500 when no limit is given
+REQUEST_WEIGHT = 2            # reported back in X-MBX-USED-WEIGHT-1M, as Binance does
+RECORD_CANDLES = 100_000
+RECORD_INTERVALS = ("1m", "1h")  # the bench / resampler base and the app / bot default
+INTERVAL_UNITS_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def interval_ms(interval):
+    # Local copy of btc_data.INTERVAL_MS: importing btc_data here would read
+    # BINANCE_BASE_URL before start_replay() gets to set it
+    return int(interval[:-1]) * INTERVAL_UNITS_MS[interval[-1]]
+
+
+def _fixture_paths(root, symbol, interval):
+    return {
+        "klines": os.path.join(root, f"klines_{symbol}_{interval}.npy"),
+        "ticker": os.path.join(root, f"ticker_{symbol}.json"),
+        "news": os.path.join(root, "news.xml"),
+        "manifest": os.path.join(root, "manifest.json"),
+    }
+
+
+# --- recording -------------------------------------------------------------
+
+def record_klines(client, symbol, interval, candles):
+    from probo_core.candles import parse_klines
+
+    step = interval_ms(interval)
+    last_open = int(time.time() * 1000) // step * step
+    first_open = last_open - (candles - 1) * step
+    pages = []
+    for page_start in range(first_open, last_open + 1, KLINES_PAGE * step):
+        pages.append(parse_klines(client.klines(symbol, interval, limit=KLINES_PAGE, start_time=page_start, raw=True)))
+        print(f"[replay] {interval} klines {min(len(pages) * KLINES_PAGE, candles):,}/{candles:,}", end="\r")
+    print()
+    records = np.concatenate(pages)
+    records = records[records["open_time"] >= first_open]
+    _, unique = np.unique(records["open_time"], return_index=True)
+    return records[unique]
+
+
+def record(out_dir=REPLAY_DIR, symbol="BTCUSDT", intervals=RECORD_INTERVALS, candles=RECORD_CANDLES, query=NEWS_QUERY):
+    """Capture live Binance klines / ticker and the Google News feed into `out_dir`.
+
+    Klines are stored as CANDLE_DTYPE records (what parse_klines makes of the
+    response bodies), the ticker and RSS bodies byte for byte. Telegram is not
+    recorded: the stand-in answers sendMessage itself so nobody gets messaged.
+    """
+    from probo_core.binance_client import get_client
+    from probo_core.sentiment import NEWS_RSS_URL
+
+    client = get_client()
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    for interval in intervals:
+        records = record_klines(client, symbol, interval, candles)
+        np.save(_fixture_paths(out_dir, symbol, interval)["klines"], records)
+        counts[interval] = len(records)
+
+    ticker = client.get("/api/v3/ticker/price", {"symbol": symbol}, raw=True)
+    news_url = f"{NEWS_RSS_URL}?q={urllib.parse.quote(query)}"
+    with urllib.request.urlopen(news_url, timeout=15) as response:
+        news = response.read()
+
+    paths = _fixture_paths(out_dir, symbol, intervals[0])
+    with open(paths["ticker"], "wb") as f:
+        f.write(ticker)
+    with open(paths["news"], "wb") as f:
+        f.write(news)
+    with open(paths["manifest"], "w", encoding="utf-8") as f:
+        json.dump({
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "symbol": symbol,
+            "candles": counts,
+            "binance_base_url": client.base_url,
+            "news_url": news_url,
+        }, f, indent=2)
+    print(f"[replay] recorded {counts} candles, ticker and {len(news):,} B of RSS into {out_dir}")
+
+
+# --- fixtures --------------------------------------------------------------
+
+def synthetic_klines(n, interval="1m", seed=0):
+    # Random-walk candles for when nothing has been recorded yet
+    from probo_core.candle_store import CANDLE_DTYPE
+
+    step = interval_ms(interval)
+    rng = np.random.default_rng(seed)
+    close = 65000 * np.exp(np.cumsum(rng.normal(0, 0.0008, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 15, n))
+    records = np.zeros(n, dtype=CANDLE_DTYPE)
+    records["open_time"] = (int(time.time() * 1000) // step - n + 1) * step + np.arange(n, dtype=np.int64) * step
+    records["open"] = open_
+    records["high"] = np.maximum(open_, close) + spread
+    records["low"] = np.minimum(open_, close) - spread
+    records["close"] = close
+    records["volume"] = rng.uniform(1, 50, n)
+    records["close_time"] = records["open_time"] + step - 1
+    return records
+
+
+def synthetic_rss(headlines, query=NEWS_QUERY):
+    items = "".join(f"<item><title>{escape(h)}</title><link>https://example.com/{i}</link></item>"
+                    for i, h in enumerate(headlines))
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>{escape(query)} - Google News</title>{items}</channel></rss>").encode("utf-8")
+
+
+def load_klines(root=REPLAY_DIR, symbol="BTCUSDT", interval="1m", candles=None):
+    # (records, recorded?) for one interval
+    path = _fixture_paths(root, symbol, interval)["klines"]
+    if os.path.exists(path):
+        klines = np.load(path)
+        return (klines[-candles:] if candles else klines), True
+    return synthetic_klines(candles or RECORD_CANDLES, interval), False
+
+
+def load_fixtures(root=REPLAY_DIR, symbol="BTCUSDT", interval="1m", candles=None):
+    """Recorded fixtures from `root`, falling back to synthetic data for anything missing.
+
+    Only `interval` is loaded up front; the server loads others on first request.
+    """
+    paths = _fixture_paths(root, symbol, interval)
+    klines, recorded = load_klines(root, symbol, interval, candles)
+
+    if os.path.exists(paths["ticker"]):
+        with open(paths["ticker"], "rb") as f:
+            ticker = f.read()
+    else:
+        ticker = json.dumps({"symbol": symbol, "price": f"{klines['close'][-1]:.8f}"}).encode()
+
+    if os.path.exists(paths["news"]):
+        with open(paths["news"], "rb") as f:
+            news = f.read()
+    else:
+        with open(HEADLINES_PATH, "r", encoding="utf-8") as f:
+            news = synthetic_rss([line.strip() for line in f if line.strip()][:100])
+
+    return {"root": root, "symbol": symbol, "interval": interval, "candles": candles, "klines": klines,
+            "ticker": ticker, "news": news, "recorded": recorded}
+
+
+# --- stand-in server -------------------------------------------------------
+
+def _balanced_markdown(text):
+    # Telegram rejects legacy Markdown with an entity left open (e.g. a lone `*`)
+    return all(text.count(mark) % 2 == 0 for mark in "*_`")
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body, content_type="application/json", headers=None):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        self.server.count(url.path)
+        if url.path.startswith("/api/") and self.server.throttled():
+            self._reply(429, b'{"code":-1003,"msg":"Too many requests."}',
+                        headers={"Retry-After": str(self.server.retry_after)})
+        elif url.path == "/api/v3/klines":
+            weight = {"X-MBX-USED-WEIGHT-1M": str(self.server.use_weight())}
+            self._reply(200, self.server.klines_body(params), headers=weight)
+        elif url.path == "/api/v3/ticker/price":
+            weight = {"X-MBX-USED-WEIGHT-1M": str(self.server.use_weight())}
+            self._reply(200, self.server.ticker, headers=weight)
+        elif url.path.startswith(RSS_PATH):
+            self._reply(200, self.server.news, content_type="application/rss+xml; charset=utf-8")
+        else:
+            self._reply(404, b'{"code":-1,"msg":"not recorded"}')
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        self.server.count(url.path)
+        payload = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not url.path.endswith("/sendMessage"):
+            self._reply(404, b'{"ok":false,"error_code":404,"description":"Not Found"}')
+            return
+        message = json.loads(payload or b"{}")
+        if message.get("parse_mode") == "Markdown" and not _balanced_markdown(message.get("text", "")):
+            self._reply(400, b'{"ok":false,"error_code":400,"description":"Bad Request: can\'t parse entities"}')
+            return
+        with self.server.lock:
+            self.server.sent.append(message)
+            message_id = len(self.server.sent)
+        result = {"message_id": message_id, "chat": {"id": message.get("chat_id")}, "date": int(time.time()),
+                  "text": message.get("text", "")}
+        self._reply(200, json.dumps({"ok": True, "result": result}).encode())
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Local stand-in for Binance REST, the Google News feed and Telegram sendMessage.
+
+    Klines are served from the fixture records of the requested interval,
+    shifted so the newest one is the candle forming right now; startTime / endTime / limit behave as on
+    Binance. `latency` (seconds) is added to every reply to emulate the network, and
+    `throttle()` makes the next Binance requests answer 429 with a Retry-After.
+    sendMessage answers 400 to unbalanced Markdown, as Telegram does.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, fixtures, host="127.0.0.1", port=0, latency=0.0):
+        super().__init__((host, port), _ReplayHandler)
+        self.fixtures = fixtures
+        self.klines = fixtures["klines"]
+        self.recorded = fixtures["recorded"]
+        self._series = {fixtures["interval"]: fixtures["klines"]}
+        self.ticker = fixtures["ticker"]
+        self.news = fixtures["news"]
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = Counter()  # path -> requests served
+        self.sent = []             # sendMessage payloads received
+        self._weight_minute, self._weight = None, 0
+        self._throttle, self.retry_after = 0, 1
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, path):
+        with self.lock:
+            self.requests[path] += 1
+
+    def use_weight(self):
+        minute = int(time.time() // 60)
+        with self.lock:
+            if minute != self._weight_minute:
+                self._weight_minute, self._weight = minute, 0
+            self._weight += REQUEST_WEIGHT
+            return self._weight
+
+    def throttle(self, count=1, retry_after=1):
+        # The next `count` Binance requests get 429, as when over the weight limit
+        with self.lock:
+            self._throttle, self.retry_after = count, retry_after
+
+    def throttled(self):
+        with self.lock:
+            if self._throttle <= 0:
+                return False
+            self._throttle -= 1
+            return True
+
+    def series(self, interval):
+        with self.lock:
+            if interval not in self._series:
+                f = self.fixtures
+                self._series[interval] = load_klines(f["root"], f["symbol"], interval, f["candles"])[0]
+            return self._series[interval]
+
+    def klines_body(self, params):
+        interval = params.get("interval", self.fixtures["interval"])
+        klines, step = self.series(interval), interval_ms(interval)
+        shift = int(time.time() * 1000) // step * step - int(klines["open_time"][-1])
+        open_times = klines["open_time"] + shift
+        limit = min(int(params.get("limit", DEFAULT_KLINES_LIMIT)), KLINES_PAGE)
+        end = len(open_times)
+        if "endTime" in params:
+            end = int(np.searchsorted(open_times, int(params["endTime"]), side="right"))
+        if "startTime" in params:
+            start = int(np.searchsorted(open_times, int(params["startTime"]), side="left"))
+            end = min(end, start + limit)
+        else:
+            start = max(0, end - limit)
+        rows = klines[start:end]
+        return json.dumps([
+            [int(t), f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.8f}", int(t) + step - 1,
+             "0", 0, "0", "0", "0"]
+            for t, o, h, l, c, v in zip(open_times[start:end].tolist(), rows["open"].tolist(), rows["high"].tolist(),
+                                        rows["low"].tolist(), rows["close"].tolist(), rows["volume"].tolist())
+        ], separators=(",", ":")).encode()
+
+    def env(self):
+        # What the app, the bot and probo_core read to find their upstreams
+        return {
+            "BINANCE_BASE_URL": self.url,
+            "BTC_NEWS_RSS_URL": self.url + RSS_PATH,
+            "TELEGRAM_API_URL": self.url,
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def start_replay(root=REPLAY_DIR, symbol="BTCUSDT", interval="1m", candles=None, port=0, latency=0.0):
+    """Serve the fixtures and point this process's environment at them.
+
+    The upstream URLs are read when probo_core / telegram_bot are imported, so
+    call this before importing anything that talks to Binance, News or Telegram.
+    """
+    server = ReplayServer(load_fixtures(root, symbol, interval, candles), port=port, latency=latency).start()
+    os.environ.update(server.env())
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record upstream responses into fixtures, or serve them locally")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="capture live Binance and Google News responses")
+    rec.add_argument("--out", default=REPLAY_DIR)
+    rec.add_argument("--symbol", default="BTCUSDT")
+    rec.add_argument("--intervals", nargs="+", default=list(RECORD_INTERVALS))
+    rec.add_argument("--candles", type=int, default=RECORD_CANDLES)
+    rec.add_argument("--query", default=NEWS_QUERY)
+
+    serve = sub.add_parser("serve", help="serve the fixtures (or synthetic data) as Binance / News / Telegram")
+    serve.add_argument("--fixtures", default=REPLAY_DIR)
+    serve.add_argument("--symbol", default="BTCUSDT")
+    serve.add_argument("--interval", default="1m")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency-ms", type=float, default=0.0, help="added to every reply")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.out, args.symbol, args.intervals, args.candles, args.query)
+        return
+
+    fixtures = load_fixtures(args.fixtures, args.symbol, args.interval)
+    server = ReplayServer(fixtures, port=args.port, latency=args.latency_ms / 1000)
+    print(f"[replay] {len(fixtures['klines']):,} {'recorded' if fixtures['recorded'] else 'synthetic'} "
+          f"{args.symbol} {args.interval} candles on {server.url}")
+    print("Point the app / bot at it with:")
+    for name, value in server.env().items():
+        print(f"  export {name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
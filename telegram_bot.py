@@ -1,27 +1,67 @@
 # telegram_bot.py
 
-import requests
+import os
+import threading
+
+from probo_core import metrics
+from telegram_outbox import TelegramOutbox
 
 # Your bot token and user ID
-BOT_TOKEN = "7961650111:AAEUAwXv16l3Pb_9EFT_Umy0fYNjN5ijAqU"
+BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "7961650111:AAEUAwXv16l3Pb_9EFT_Umy0fYNjN5ijAqU")
 USER_ID = 5368095453  # You can also use your numeric ID if this fails
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+
+# Every alert fans out to these chats; TELEGRAM_CHAT_IDS adds more (comma-separated)
+_subscribers = [USER_ID] + [c.strip() for c in os.environ.get("TELEGRAM_CHAT_IDS", "").split(",") if c.strip()]
+_outbox = None
+_lock = threading.Lock()
+
+
+def subscribe(chat_id):
+    with _lock:
+        if chat_id not in _subscribers:
+            _subscribers.append(chat_id)
+
+
+def unsubscribe(chat_id):
+    with _lock:
+        if chat_id in _subscribers:
+            _subscribers.remove(chat_id)
+
+
+def subscribers():
+    with _lock:
+        return list(_subscribers)
+
+
+def get_outbox():
+    global _outbox
+    with _lock:
+        if _outbox is None:
+            _outbox = TelegramOutbox(BOT_TOKEN, base_url=TELEGRAM_API_URL)
+        return _outbox
+
+
+@metrics.register_collector
+def _collect_outbox():
+    outbox = _outbox
+    if outbox is None:
+        return
+    stats = outbox.stats()
+    for name in ("pending", "chats_waiting"):
+        yield "gauge", f"telegram_{name}", stats.pop(name), {}
+    for name, value in stats.items():
+        yield "counter", "telegram_messages_total", value, {"outcome": name}
+
 
-def send_telegram_alert(message):
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": USER_ID,
-        "text": message,
-        "parse_mode": "Markdown"
-    }
-    try:
-        response = requests.post(url, json=payload)
-        if response.status_code == 200:
-            print("Telegram alert sent successfully.")
-        else:
-            print("Failed to send alert:", response.text)
-    except Exception as e:
-        print("Telegram alert error:", str(e))
+def send_telegram_alert(message, chat_ids=None):
+    # Queues the alert and returns at once; the outbox handles rate limits, retries and dedupe
+    queued = get_outbox().send(message, chat_ids if chat_ids is not None else subscribers())
+    print(f"Telegram alert queued for {queued} chat(s).")
+    return queued
 
 # Test message
 if __name__ == "__main__":
     send_telegram_alert("🚨 Test alert from BTC Probo Predictor!")
+    get_outbox().flush(timeout=30)
+    print(get_outbox().stats())
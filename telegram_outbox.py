@@ -0,0 +1,287 @@
+# telegram_outbox.py
+
+import hashlib
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from probo_core import metrics
+
+TELEGRAM_MESSAGE_LIMIT = 4096   # characters per sendMessage
+PER_CHAT_INTERVAL = 1.0         # Telegram: about one message per second per chat
+GLOBAL_RATE = 30.0              # ... and about 30 messages per second per bot
+DEDUPE_WINDOW = 300.0           # identical alert to the same chat within this many seconds is dropped
+MAX_QUEUE = 10_000              # pending messages across all chats
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BATCH_SEPARATOR = "\n\n"
+
+
+def split_message(text, limit=TELEGRAM_MESSAGE_LIMIT):
+    # Pieces of at most `limit` characters, cut at line breaks where possible
+    if len(text) <= limit:
+        return [text]
+    pieces, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:  # a single line that cannot fit: hard cut
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:limit])
+            line = line[limit:]
+        if len(current) + len(line) > limit:
+            pieces.append(current)
+            current = ""
+        current += line
+    if current:
+        pieces.append(current)
+    return [p.rstrip("\n") or p for p in pieces]
+
+
+class _TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self):
+        # Seconds until a token is available (0 if one is now); caller holds the outbox lock
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class TelegramOutbox:
+    """Bounded background queue of Telegram messages, drained by a pool of workers.
+
+    `send` never blocks: it dedupes, queues and returns. Workers respect the
+    per-chat and global rate limits, merge messages that piled up for one
+    chat into a single sendMessage (up to Telegram's length limit), honour
+    429 `retry_after` and back off exponentially on other failures. Messages
+    over the limit are split at line breaks when queued, and a merged batch
+    Telegram rejects (e.g. one message's unbalanced Markdown) is re-sent one
+    message at a time so only the bad one is lost.
+    """
+
+    def __init__(self, token, base_url="https://api.telegram.org", workers=4, max_queue=MAX_QUEUE,
+                 per_chat_interval=PER_CHAT_INTERVAL, global_rate=GLOBAL_RATE, dedupe_window=DEDUPE_WINDOW,
+                 max_retries=MAX_RETRIES, timeout=(3.05, 10), parse_mode="Markdown"):
+        self.url = f"{base_url.rstrip('/')}/bot{token}/sendMessage"
+        self.max_queue = max_queue
+        self.per_chat_interval = per_chat_interval
+        self.dedupe_window = dedupe_window
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.parse_mode = parse_mode
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._cond = threading.Condition()
+        self._pending = {}     # chat_id -> deque of texts
+        self._ready = []       # heap of (ready_at, seq, chat_id); one entry per chat with pending, idle messages
+        self._scheduled = set()
+        self._in_flight = set()
+        self._attempts = {}    # chat_id -> failed attempts for its current batch
+        self._unbatched = {}   # chat_id -> messages to send one by one after a rejected batch
+        self._next_allowed = {}
+        self._seen = {}        # (chat_id, digest) -> last queued at
+        self._seq = itertools.count()
+        self._global = _TokenBucket(global_rate, burst=1)  # paced, no bursts above the rate
+        self._queued = 0
+        self._stopped = False
+        self.counters = {"queued": 0, "sent": 0, "batched": 0, "deduped": 0, "dropped": 0, "retries": 0, "failed": 0,
+                         "split": 0}
+
+        self._workers = [threading.Thread(target=self._work, name=f"telegram-{i}", daemon=True) for i in range(workers)]
+        for t in self._workers:
+            t.start()
+
+    # --- producer side -----------------------------------------------------
+
+    def send(self, text, chat_ids):
+        # Queue `text` for every chat in `chat_ids`; returns how many were queued
+        if isinstance(chat_ids, (str, int)):
+            chat_ids = [chat_ids]
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        pieces = split_message(text)
+        queued = 0
+        with self._cond:
+            now = time.monotonic()
+            self._expire_seen(now)
+            for chat_id in chat_ids:
+                key = (chat_id, digest)
+                if key in self._seen:
+                    self.counters["deduped"] += 1
+                    continue
+                if self._queued >= self.max_queue:
+                    self.counters["dropped"] += 1
+                    continue
+                self._seen[key] = now
+                self._pending.setdefault(chat_id, deque()).extend(pieces)
+                self._queued += len(pieces)
+                queued += 1
+                self._schedule(chat_id, self._next_allowed.get(chat_id, now))
+            self.counters["queued"] += queued * len(pieces)
+            if queued:
+                self._cond.notify_all()
+        if queued < len(chat_ids) and self.counters["dropped"]:
+            print(f"[telegram] outbox full ({self.max_queue}), dropped messages so far: {self.counters['dropped']}")
+        return queued
+
+    def _expire_seen(self, now):
+        if len(self._seen) > 2 * self.max_queue or (self._seen and now - next(iter(self._seen.values())) > self.dedupe_window):
+            self._seen = {k: t for k, t in self._seen.items() if now - t <= self.dedupe_window}
+
+    def _schedule(self, chat_id, ready_at):
+        # Caller holds the lock
+        if chat_id in self._scheduled or chat_id in self._in_flight:
+            return
+        self._scheduled.add(chat_id)
+        heapq.heappush(self._ready, (ready_at, next(self._seq), chat_id))
+
+    # --- worker side -------------------------------------------------------
+
+    def _take_batch(self):
+        # Block until some chat is due and a global token is free; returns (chat_id, text, parts) or None on stop
+        with self._cond:
+            while True:
+                if self._stopped and not self._ready:
+                    return None
+                if not self._ready:
+                    self._cond.wait()
+                    continue
+                wait = self._ready[0][0] - time.monotonic()
+                if wait <= 0:
+                    wait = self._global.wait_time()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                _, _, chat_id = heapq.heappop(self._ready)
+                self._scheduled.discard(chat_id)
+                self._global.take()
+                self._in_flight.add(chat_id)
+
+                pending = self._pending[chat_id]
+                parts = [pending.popleft()]
+                size = len(parts[0])
+                while pending and not self._unbatched.get(chat_id) and size + len(BATCH_SEPARATOR) + len(pending[0]) <= TELEGRAM_MESSAGE_LIMIT:
+                    size += len(BATCH_SEPARATOR) + len(pending[0])
+                    parts.append(pending.popleft())
+                return chat_id, BATCH_SEPARATOR.join(parts), parts
+
+    def _finish(self, chat_id, parts, delay, sent, counts):
+        # sent: True delivered, False given up on, None to be retried after `delay`
+        with self._cond:
+            for name, n in counts.items():
+                self.counters[name] += n
+            self._in_flight.discard(chat_id)
+            now = time.monotonic()
+            if sent is None:
+                # Retry: put the batch back in front of anything queued since
+                self._pending[chat_id].extendleft(reversed(parts))
+            else:
+                self._queued -= len(parts)
+                self._attempts.pop(chat_id, None)
+                if chat_id in self._unbatched:
+                    self._unbatched[chat_id] -= len(parts)
+                    if self._unbatched[chat_id] <= 0:
+                        del self._unbatched[chat_id]
+            self._next_allowed[chat_id] = now + delay
+            if self._pending.get(chat_id):
+                self._schedule(chat_id, now + delay)
+            else:
+                self._pending.pop(chat_id, None)
+            self._cond.notify_all()
+
+    def _work(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            chat_id, text, parts = batch
+            with metrics.span("telegram_send"):
+                status, retry_after, error = self._post(chat_id, text)
+            metrics.inc("telegram_responses_total", status=status or "error")
+
+            if status == 200:
+                self._finish(chat_id, parts, self.per_chat_interval, sent=True,
+                             counts={"sent": 1, "batched": len(parts) - 1})
+                continue
+
+            if status == 400 and len(parts) > 1:
+                # One of the merged messages is malformed: send them one by one instead
+                with self._cond:
+                    self._unbatched[chat_id] = len(parts)
+                self._finish(chat_id, parts, self.per_chat_interval, sent=None, counts={"split": 1})
+                continue
+
+            # Only this worker touches the chat while it is in flight
+            attempts = self._attempts[chat_id] = self._attempts.get(chat_id, 0) + 1
+            retryable = status is None or status == 429 or status >= 500
+            if retryable and attempts <= self.max_retries:
+                delay = retry_after if retry_after is not None else BACKOFF_BASE * 2 ** (attempts - 1)
+                self._finish(chat_id, parts, max(delay, self.per_chat_interval), sent=None, counts={"retries": 1})
+            else:
+                print(f"[telegram] giving up on chat {chat_id} after {attempts} attempt(s): {error}")
+                self._finish(chat_id, parts, self.per_chat_interval, sent=False, counts={"failed": len(parts)})
+
+    def _post(self, chat_id, text):
+        # Returns (status or None, retry_after or None, error description)
+        payload = {"chat_id": chat_id, "text": text}
+        if self.parse_mode:
+            payload["parse_mode"] = self.parse_mode
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            return None, None, f"{type(e).__name__}: {e}"
+        if response.status_code == 200:
+            return 200, None, None
+        retry_after = None
+        try:
+            body = response.json()
+            retry_after = body.get("parameters", {}).get("retry_after")
+            description = body.get("description", response.text)
+        except ValueError:
+            description = response.text
+        return response.status_code, retry_after, f"{response.status_code} {description}"
+
+    # --- lifecycle ---------------------------------------------------------
+
+    def stats(self):
+        with self._cond:
+            return {**self.counters, "pending": self._queued, "chats_waiting": len(self._pending)}
+
+    def pending(self):
+        with self._cond:
+            return self._queued
+
+    def flush(self, timeout=None):
+        # Wait until everything queued has been sent or given up on; True if the queue drained
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queued:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self.session.close()
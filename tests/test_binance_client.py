@@ -0,0 +1,103 @@
+# test_binance_client.py
+
+import threading
+import time
+
+import pytest
+import requests
+
+from probo_core import metrics
+from probo_core.binance_client import BinanceClient
+from replay import ReplayServer, load_fixtures
+
+
+@pytest.fixture
+def server(tmp_path):
+    # No recordings under tmp_path, so the stand-in serves synthetic candles
+    server = ReplayServer(load_fixtures(str(tmp_path), "BTCUSDT", "1m", 2000)).start()
+    yield server
+    server.stop()
+
+
+def _concurrently(n, fn):
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def run(i):
+        barrier.wait()
+        results[i] = fn()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_identical_gets_share_one_request(server):
+    server.latency = 0.3  # long enough that every caller arrives while the first is in flight
+    client = BinanceClient(base_url=server.url)
+    results = _concurrently(8, lambda: client.klines("BTCUSDT", "1m", limit=50))
+    assert server.requests["/api/v3/klines"] == 1
+    assert all(r is results[0] for r in results) and len(results[0]) == 50
+
+
+def test_different_params_are_not_coalesced(server):
+    server.latency = 0.2
+    client = BinanceClient(base_url=server.url)
+    limits = iter([10, 20, 30, 40])
+    lock = threading.Lock()
+
+    def fetch():
+        with lock:
+            limit = next(limits)
+        return client.klines("BTCUSDT", "1m", limit=limit)
+
+    results = _concurrently(4, fetch)
+    assert server.requests["/api/v3/klines"] == 4
+    assert sorted(len(r) for r in results) == [10, 20, 30, 40]
+
+
+def test_used_weight_follows_the_server(server):
+    client = BinanceClient(base_url=server.url)
+    client.klines("BTCUSDT", "1m", limit=5)
+    client.ticker_price("BTCUSDT")
+    assert client.used_weight == 4
+
+
+def test_429_waits_for_retry_after(server):
+    client = BinanceClient(base_url=server.url, max_retries=2)
+    server.throttle(1, retry_after=1)
+    before = metrics.values().get(("binance_throttle_seconds_total", ()), 0)
+    start = time.monotonic()
+    rows = client.klines("BTCUSDT", "1m", limit=5)
+    assert len(rows) == 5
+    assert time.monotonic() - start >= 0.9
+    assert server.requests["/api/v3/klines"] == 2
+    if metrics.enabled():
+        assert metrics.values()[("binance_throttle_seconds_total", ())] - before > 0
+
+
+def test_429_gives_up_after_max_retries(server):
+    client = BinanceClient(base_url=server.url, max_retries=1)
+    server.throttle(5, retry_after=0)
+    with pytest.raises(requests.HTTPError) as exc:
+        client.klines("BTCUSDT", "1m", limit=5)
+    assert exc.value.response.status_code == 429
+    assert server.requests["/api/v3/klines"] == 2
+
+
+def test_coalesced_callers_share_the_error(server):
+    server.latency = 0.3
+    server.throttle(10, retry_after=0)
+    client = BinanceClient(base_url=server.url, max_retries=0)
+
+    def fetch():
+        try:
+            client.klines("BTCUSDT", "1m", limit=5)
+        except requests.HTTPError as e:
+            return e
+    errors = _concurrently(4, fetch)
+    assert server.requests["/api/v3/klines"] == 1
+    assert all(isinstance(e, requests.HTTPError) for e in errors)
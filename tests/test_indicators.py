@@ -0,0 +1,84 @@
+# test_indicators.py
+
+import numpy as np
+import pytest
+
+from probo_core.indicators import IndicatorEngine, compute_indicators, ema_series, rsi_series
+
+
+def _closes(n=300, seed=0):
+    return 60000 + np.cumsum(np.random.default_rng(seed).normal(0, 50, n))
+
+
+def test_engine_matches_pandas_reference():
+    closes = _closes()
+    out = compute_indicators(closes)
+    np.testing.assert_allclose(out["RSI"], rsi_series(closes), rtol=1e-9, equal_nan=True)
+    for w in (20, 50):
+        np.testing.assert_allclose(out[f"EMA_{w}"], ema_series(closes, w), rtol=1e-9, equal_nan=True)
+    # warm-up: NaN until the window is full
+    assert np.isnan(out["RSI"][:13]).all() and not np.isnan(out["RSI"][13:]).any()
+    assert np.isnan(out["EMA_50"][:49]).all() and not np.isnan(out["EMA_50"][49:]).any()
+
+
+def test_flat_series_rsi_is_100():
+    out = compute_indicators(np.full(30, 100.0))
+    assert out["RSI"][-1] == 100.0 == rsi_series(np.full(30, 100.0))[-1]
+
+
+def test_revise_replaces_the_last_close():
+    closes = _closes(120, seed=1)
+    engine = IndicatorEngine()
+    for close in closes[:-1]:
+        engine.append(close)
+    # the forming candle ticks a few times before it closes at closes[-1]
+    engine.append(closes[-1] + 400)
+    for tick in (closes[-1] - 250, closes[-1] + 10):
+        engine.revise(tick)
+    values = engine.revise(closes[-1])
+
+    assert engine.count == len(closes)
+    assert values["RSI"] == pytest.approx(rsi_series(closes)[-1], rel=1e-9)
+    assert values["EMA_20"] == pytest.approx(ema_series(closes, 20)[-1], rel=1e-9)
+    assert values["EMA_50"] == pytest.approx(ema_series(closes, 50)[-1], rel=1e-9)
+
+
+def test_revise_on_a_fresh_engine_appends():
+    engine = IndicatorEngine(rsi_window=2, ema_windows=(2,))
+    engine.revise(10.0)
+    assert engine.count == 1
+
+
+def test_snapshot_round_trip_keeps_revise_base():
+    closes = _closes(80, seed=2)
+    engine = IndicatorEngine()
+    for close in closes:
+        engine.append(close)
+    snap = engine.snapshot()
+    snap["state"]["ema"] = {str(w): v for w, v in snap["state"]["ema"].items()}  # as after a JSON round trip
+    snap["base"]["ema"] = {str(w): v for w, v in snap["base"]["ema"].items()}
+    restored = IndicatorEngine.from_snapshot(snap)
+    assert restored.revise(closes[-1] + 5) == engine.revise(closes[-1] + 5)
+
+
+def test_engine_matches_ta():
+    ta = pytest.importorskip("ta")
+    import pandas as pd
+    closes = _closes(seed=3)
+    out = compute_indicators(closes)
+    series = pd.Series(closes)
+    np.testing.assert_allclose(out["RSI"], ta.momentum.RSIIndicator(series, window=14).rsi().to_numpy(),
+                               rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(out["EMA_20"], ta.trend.EMAIndicator(series, window=20).ema_indicator().to_numpy(),
+                               rtol=1e-9, equal_nan=True)
+
+
+def test_add_technical_indicators_without_a_datetime_index():
+    import pandas as pd
+    from probo_core.btc_data import add_technical_indicators
+    closes = _closes(120, seed=4)
+    df = add_technical_indicators(pd.DataFrame({"close": closes}))  # RangeIndex
+    np.testing.assert_allclose(df["RSI"], rsi_series(closes), rtol=1e-9, equal_nan=True)
+    # a different frame on the same positions must not reuse the first one's values
+    df = add_technical_indicators(pd.DataFrame({"close": closes[::-1]}))
+    np.testing.assert_allclose(df["EMA_20"], ema_series(closes[::-1], 20), rtol=1e-9, equal_nan=True)
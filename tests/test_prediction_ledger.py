@@ -0,0 +1,71 @@
+# test_prediction_ledger.py
+
+import numpy as np
+
+from probo_core.prediction_ledger import GROUPS, LEDGER_DTYPE, PredictionLedger, resolve_due
+
+
+def _rows(n, created_ms=1_000, target_ms=2_000):
+    rows = np.zeros(n, dtype=LEDGER_DTYPE)
+    rows["created_ms"] = created_ms
+    rows["target_ms"] = target_ms
+    rows["target_price"] = 100.0
+    rows["projected_price"] = 105.0
+    rows["realized_price"] = np.nan
+    rows["rsi"] = 50.0
+    rows["hours_remaining"] = 1.5
+    rows["vote"] = 1
+    return rows
+
+
+def test_missing_ledger_queries_are_empty(tmp_path):
+    ledger = PredictionLedger(str(tmp_path / "none" / "ledger.bin"))
+    assert len(ledger) == 0
+    assert ledger.summary() == {"predictions": 0, "resolved": 0, "pending": 0, "hits": 0, "hit_rate": None}
+    for by in GROUPS:
+        assert ledger.hit_rates(by) == []
+    indices, targets = ledger.due(10 ** 13)
+    assert len(indices) == 0 and len(targets) == 0
+    assert resolve_due(ledger, now_ms=10 ** 13) == 0
+
+
+def test_empty_ledger_then_append(tmp_path):
+    path = tmp_path / "ledger.bin"
+    path.touch()
+    ledger = PredictionLedger(str(path))
+    assert ledger.summary()["predictions"] == 0
+
+    ledger.append(_rows(3))
+    assert ledger.summary()["pending"] == 3
+    indices, _ = ledger.due(10 ** 13)
+    ledger.resolve(indices, [110.0, 90.0, 100.0], resolved_ms=3_000)
+    summary = ledger.summary()
+    assert (summary["resolved"], summary["hits"]) == (3, 2)
+
+
+def test_nan_rsi_is_its_own_zone(tmp_path):
+    ledger = PredictionLedger(str(tmp_path / "ledger.bin"))
+    rows = _rows(3)
+    rows["rsi"] = [np.nan, 80.0, 50.0]
+    ledger.append(rows)
+    zones = {r["rsi_zone"]: r["predictions"] for r in ledger.hit_rates("rsi_zone")}
+    assert zones == {"neutral": 1, "overbought": 1, "unknown": 1}
+
+
+def test_record_grid_uses_the_given_empty_ledger(tmp_path):
+    import datetime
+    from probo_core.candles import Candles
+    from probo_core.market_snapshot import MarketSnapshot
+    from probo_core.prediction_ledger import record_grid
+    from probo_core.predictor import recommend_probo_votes_for_grid
+
+    closes = np.linspace(60000, 61000, 20)
+    snapshot = MarketSnapshot("BTCUSDT", "1h", Candles(np.arange(20) * 3_600_000, closes, closes, closes, closes,
+                                                       np.ones(20)), 61000.0, 0.2)
+    block = datetime.datetime.now(datetime.timezone.utc).replace(second=0, microsecond=0)
+    table = recommend_probo_votes_for_grid([60000, 62000], [block], snapshot=snapshot)
+    ledger = PredictionLedger(str(tmp_path / "ledger.bin"))
+    record_grid(table, snapshot, market={"rsi": 50.0}, advice={"verdict": "GO", "trust": {}, "caution": {}},
+                ledger=ledger)
+    assert len(ledger) == 2
+    assert (ledger.read()["target_ms"] == int(block.timestamp() * 1000)).all()
@@ -0,0 +1,45 @@
+# test_sentiment_cache.py
+
+import json
+import threading
+
+from probo_core.sentiment_cache import SentimentCache
+
+
+def _scorer(headlines):
+    return [len(h) / 100 for h in headlines]
+
+
+def test_scores_survive_a_reload(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = SentimentCache(path=path)
+    assert cache.scores(["BTC rallies", "btc  RALLIES", "ETH dips"], _scorer) == [0.11, 0.11, 0.08]
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    reloaded = SentimentCache(path=path)
+    assert reloaded.scores(["BTC rallies"], lambda h: 1 / 0) == [0.11]
+    assert reloaded.hits == 1
+
+
+def test_overlapping_saves(tmp_path):
+    # Several caches on one file, as the app, the bot and a batch run are
+    path = str(tmp_path / "cache.json")
+    caches = [SentimentCache(path=path) for _ in range(4)]
+    errors = []
+
+    def run(i):
+        try:
+            for j in range(50):
+                caches[i].scores([f"headline {i} {j}"], _scorer)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)) == 50  # whole file from one of the writers
+    assert [p.name for p in tmp_path.iterdir()] == ["cache.json"]
@@ -0,0 +1,80 @@
+# test_telegram_outbox.py
+
+import pytest
+
+from replay import ReplayServer, load_fixtures
+from telegram_outbox import BATCH_SEPARATOR, TelegramOutbox, split_message
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = ReplayServer(load_fixtures(str(tmp_path), "BTCUSDT", "1m", 100)).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def outbox(server):
+    outbox = TelegramOutbox("TOKEN", base_url=server.url, per_chat_interval=0.2, global_rate=100)
+    yield outbox
+    outbox.close(timeout=5)
+
+
+def _texts(server, chat_id):
+    return [m["text"] for m in server.sent if m["chat_id"] == chat_id]
+
+
+def test_split_message_cuts_at_line_breaks():
+    text = "\n".join(f"line {i:03d}" for i in range(100))  # 8 characters + newline each
+    pieces = split_message(text, limit=100)
+    assert all(len(p) <= 100 for p in pieces)
+    assert "\n".join(pieces) == text
+    assert split_message("short", limit=100) == ["short"]
+
+
+def test_split_message_hard_cuts_a_long_line():
+    pieces = split_message("x" * 250, limit=100)
+    assert [len(p) for p in pieces] == [100, 100, 50]
+
+
+def test_duplicate_alert_is_sent_once_per_chat(server, outbox):
+    assert outbox.send("*BTC* alert", [1, 2]) == 2
+    assert outbox.send("*BTC* alert", [1, 2]) == 0
+    assert outbox.send("*BTC* other alert", 1) == 1
+    assert outbox.flush(timeout=5)
+    assert _texts(server, 2) == ["*BTC* alert"]
+    assert BATCH_SEPARATOR.join(_texts(server, 1)) == "*BTC* alert" + BATCH_SEPARATOR + "*BTC* other alert"
+    assert outbox.stats()["deduped"] == 2
+
+
+def test_messages_piling_up_for_a_chat_are_merged(server, outbox):
+    for i in range(6):
+        outbox.send(f"alert {i}", 7)
+    assert outbox.flush(timeout=5)
+    texts = _texts(server, 7)
+    # the first goes out at once, the rest wait out the per-chat interval together
+    assert len(texts) < 6
+    assert BATCH_SEPARATOR.join(texts) == BATCH_SEPARATOR.join(f"alert {i}" for i in range(6))
+    assert outbox.stats()["batched"] == 6 - len(texts)
+
+
+def test_oversized_message_arrives_in_order_within_the_limit(server, outbox):
+    text = "\n".join(f"{i:05d} " + "x" * 90 for i in range(120))  # ~11.6k characters
+    outbox.send(text, 3)
+    assert outbox.flush(timeout=10)
+    texts = _texts(server, 3)
+    assert len(texts) == 3 and all(len(t) <= 4096 for t in texts)
+    assert "\n".join(texts) == text
+    assert outbox.stats()["sent"] == 3
+
+
+def test_rejected_batch_is_resent_one_by_one(server, outbox):
+    outbox.send("first", 5)
+    assert outbox.flush(timeout=5)
+    # these three pile up behind the per-chat interval and are merged; the bad one sinks the batch
+    for text in ("*ok one*", "*broken", "*ok two*"):
+        outbox.send(text, 5)
+    assert outbox.flush(timeout=5)
+    assert _texts(server, 5) == ["first", "*ok one*", "*ok two*"]
+    stats = outbox.stats()
+    assert (stats["split"], stats["failed"], stats["pending"]) == (1, 1, 0)